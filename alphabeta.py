@@ -1,16 +1,43 @@
 #Citations: Artifical Intelligence Text Book
 
 from framework import Player
-from math import inf
+from search import SearchConfig, SearchEngine
+
+# Depth at which the search stops and estimates the outcome of a game
+DEPTH = 5
+
 
 class MiniMaxPlayer(Player):
-    # Initialize the player without an opponent initially
-    def __init__(self):
+    # Depth searched unless the player is given another depth or a budget
+    default_depth = DEPTH
+
+    # Initialize the player without an opponent initially:
+    # The player searches to a fixed depth, unless it is given a time (in seconds) or node budget for each move.
+    # It then deepens its search one ply at a time up to the depth given, and makes the move of the deepest
+    # search completed within the budget. Games are estimated with their own feature weights unless others are given,
+    # and the moves at the root are searched in parallel by a number of worker processes if more than one is given,
+    # or the whole game with Lazy SMP. The player may also be given the file of an endgame database to look games up in,
+    # and the file of an opening book to take its first moves from.
+    # A search configuration may be given instead for the other settings of the search engine, and a function to call
+    # with the statistics of the search for each move
+    def __init__(self, depth=None, time_limit=None, node_limit=None, weights=None, workers=1, smp=False, endgames=None,
+                 book=None, config=None, callback=None):
         self.opponent = None
 
-    # Set the player's opponent
+        if config is None:
+            if depth is None and time_limit is None and node_limit is None:
+                depth = self.default_depth
+
+            config = SearchConfig(depth, time_limit, node_limit, weights=weights, workers=workers, smp=smp,
+                                  endgames=endgames, book=book)
+
+        self.engine = SearchEngine(config, callback=callback)
+
+    # Set the player's opponent, sharing one transposition table, move ordering and budget between the two players'
+    # searches if they value games alike
     def assume(self, opponent):
         self.opponent = opponent
+        self.engine.share(opponent.engine)
 
     # Return whether the player maximizes or not
     def maximizes(self):
@@ -18,11 +45,11 @@ class MiniMaxPlayer(Player):
 
     # Return the move selected by the player
     def move(self, game):
-        return self.value(game)[1]
+        return self.engine.search(game)
 
-    # Return the best value of the game for the player
-    def value(self, game):
-        raise NotImplementedError
+    # Stop the engine's worker processes and release its shared table and files
+    def close(self):
+        self.engine.close()
 
 
 class MaxPlayer(MiniMaxPlayer):
@@ -30,76 +57,8 @@ class MaxPlayer(MiniMaxPlayer):
     def maximizes(self):
         return True
 
-    # Return the best value and move for MAX in this game
-    def value(self, game, alpha=-inf, beta=+inf, depth=0):
-        # Is the game over?
-        utility = game.utility()
-
-        # Check if we have reached the maximum search depth as per our definition
-        if utility is None and depth >= 5:
-            # Use an evaluation function to estimate the outcome of a game
-            return game.evaluate(), None
-
-        # If the utility is available, return it
-        if utility is not None:
-            return utility, None
-
-        # Which move leads to the best outcome?
-        best_value = -inf
-        best_move = None
-
-        for move in game.moves():
-            child = game.child(move, self)
-            value = self.opponent.value(child, alpha, beta, depth + 1)[0]
-
-            # Maximizing
-            if best_move is None or value > best_value:
-                best_value = value
-                best_move = move
-
-            # Pruning
-            alpha = max(alpha, best_value)
-            if beta <= alpha:
-                break
-
-        return best_value, best_move
-
 
 class MinPlayer(MiniMaxPlayer):
 
     def maximizes(self):
         return False
-
-    # Return the best value and move for MIN in this game
-    def value(self, game, alpha=-inf, beta=+inf, depth=0):
-        # Is the game over?
-        utility = game.utility()
-
-        # Check if we have reached the maximum search depth as per our definition
-        if utility is None and depth >= 5:
-            # Use an evaluation function to estimate the outcome of a game
-            return game.evaluate(), None
-
-        # If the utility is available, return it
-        if utility is not None:
-            return utility, None
-
-        # Which move leads to the best outcome?
-        best_value = +inf
-        best_move = None
-
-        for move in game.moves():
-            child = game.child(move, self)
-            value = self.opponent.value(child, alpha, beta, depth + 1)[0]
-
-            # Minimizing
-            if best_move is None or value < best_value:
-                best_value = value
-                best_move = move
-
-            # Pruning
-            beta = min(beta, best_value)
-            if beta <= alpha:
-                break
-
-        return best_value, best_move
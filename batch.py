@@ -0,0 +1,118 @@
+# Purpose: Estimates of many games at once with NumPy, computed from their bitboards over the mill line, open pair
+#          and adjacency tables of the board, for scoring large sets of positions offline
+# Citations: NumPy: https://numpy.org/doc/stable/
+#
+# The search does not use these: its estimates read running totals kept move by move, which is faster than making
+# each child to estimate it in a batch, and a batch estimates children that alpha-beta would prune. NumPy is optional
+# and only imported once an evaluator is asked for: without it, there is no batched estimate
+
+# NumPy, once imported
+numpy = None
+
+
+# Return the advantages of arrays of counts over others, the difference over the total, or 0 where the total is 0
+def advantage(own, other):
+    total = own + other
+    return numpy.divide(own - other, total, out=numpy.zeros(len(total)), where=total != 0)
+
+
+# Return an array of 0/1 rows for the bit masks of a list of point sets, one column per point
+def point_matrix(masks, points):
+    return numpy.array([[(mask >> i) & 1 for i in range(points)] for mask in masks], dtype=numpy.int64)
+
+
+class BatchEvaluator(object):
+    # Create an evaluator for the games of a board, given by its tables
+    def __init__(self, geometry):
+        points = geometry.size
+        self.shifts = numpy.arange(points, dtype=numpy.uint64)
+
+        # Mill lines, the pairs of points of each line with the point left to complete it and the points next to that
+        # point off the line, and the neighbours of each point
+        self.lines = point_matrix(geometry.mills, points).T
+        self.pairs = point_matrix([pair for pair, space, reach in geometry.mill_pairs], points).T
+        self.spaces = point_matrix([space for pair, space, reach in geometry.mill_pairs], points).T
+        self.reach = point_matrix([reach for pair, space, reach in geometry.mill_pairs], points).T
+        self.neighbours = point_matrix(geometry.neighbours[:points], points).T
+        self.degrees = self.neighbours.sum(0)
+
+        # Whether a player left with three pieces may fly, and complete an open pair from anywhere
+        self.flying = geometry.flying
+
+    # Return an array of 0/1 rows of the points of an array of bit masks
+    def occupancy(self, bits):
+        return ((bits[:, None] >> self.shifts) & numpy.uint64(1)).astype(numpy.int64)
+
+    # Return the counts of a player's pieces given as occupancy rows, as the running totals of the games count them:
+    # Mills, open pairs, open pairs that another piece could move to complete, and blocked pieces
+    def counts(self, own, empty):
+        mills = (own @ self.lines == 3).sum(1)
+        open_pairs = (own @ self.pairs == 2) & (empty @ self.spaces == 1)
+        reach = (open_pairs & (own @ self.reach > 0)).sum(1)
+        blocked = (own * (own @ self.neighbours == self.degrees)).sum(1)
+        return mills, open_pairs.sum(1), reach, blocked
+
+    # Return the estimates of many games of a variant's game class, the same as evaluate() returns for each, using the
+    # class's weights unless others are given:
+    # Games are given as tuples of the bitboards of Max and Min, their pieces to place and whether the player the game
+    # is estimated for maximizes
+    def evaluate(self, cls, games, weights=None):
+        max_bits, min_bits, max_pieces, min_pieces, maximizes = (numpy.array(column) for column in zip(*games))
+        max_own = self.occupancy(max_bits.astype(numpy.uint64))
+        min_own = self.occupancy(min_bits.astype(numpy.uint64))
+        empty = 1 - max_own - min_own
+
+        max_mills, max_pairs, max_reach, max_blocked = self.counts(max_own, empty)
+        min_mills, min_pairs, min_reach, min_blocked = self.counts(min_own, empty)
+        totals = (max_mills, min_mills, max_pairs, min_pairs, max_reach, min_reach, max_blocked, min_blocked)
+
+        features = self.features(maximizes, max_pieces, min_pieces, max_own.sum(1), min_own.sum(1), totals)
+
+        # The weighted features are added in order, so that the sums are the same as evaluate's to the last bit
+        total = numpy.zeros(len(games))
+        for weight, feature in zip(weights or cls.weights, features):
+            total = total + weight * feature
+
+        return (total / 10).tolist()
+
+    # Return the features of many games at once, as the games' features() return them for each, from arrays of
+    # whether the player maximizes, the pieces to place and on the board of Max and Min, and their running totals
+    def features(self, maximizes, max_pieces, min_pieces, max_count, min_count, totals):
+        max_mills, min_mills, max_pairs, min_pairs, max_reach, min_reach, max_blocked, min_blocked = totals
+        where = numpy.where
+
+        # Open pairs count as possible mills while Max is placing pieces or for a player who may fly, and as likely
+        # mills while the player is placing pieces or may fly
+        max_flying = (max_count == 3) & self.flying
+        min_flying = (min_count == 3) & self.flying
+        placing = max_pieces > 0
+        max_possible = where(placing | max_flying, max_pairs, max_reach)
+        min_possible = where(placing | min_flying, min_pairs, min_reach)
+
+        mills = where(maximizes, max_mills, min_mills)
+        likely_mills = where(maximizes, where((max_pieces > 0) | max_flying, max_pairs, max_reach),
+                             where((min_pieces > 0) | min_flying, min_pairs, min_reach))
+
+        return (advantage(max_pieces, min_pieces), advantage(max_count, min_count), mills, likely_mills,
+                advantage(max_mills, min_mills), advantage(max_possible, min_possible),
+                advantage(min_blocked, max_blocked))
+
+
+# Evaluators of each board, made when first needed
+evaluators = {}
+
+
+# Return the evaluator of a board, or None without NumPy
+def evaluator(geometry):
+    global numpy
+
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+
+    if geometry.name not in evaluators:
+        evaluators[geometry.name] = BatchEvaluator(geometry)
+
+    return evaluators[geometry.name]
@@ -0,0 +1,88 @@
+# Purpose: Micro-benchmarks of the rules and evaluation functions of the games, timed on the reference positions of
+#          every phase and written out as JSON
+# Citations: timeit: https://docs.python.org/3/library/timeit.html
+#
+# python benchmark.py [--number N] [--repeat N] [--output FILE]
+#
+# The functions taking locations are timed with both of the forms they accept, bit masks and sets of locations, so
+# the two representations are compared on the same positions
+
+import json
+import sys
+from argparse import ArgumentParser
+from timeit import Timer
+from morris import MAX_SIDE, MIN_SIDE
+from perft import POSITIONS, position
+
+# Calls of each function timed in a run, and the runs of which the fastest is kept
+NUMBER = 200
+REPEAT = 5
+
+
+# Return the functions to time on a game, by name, each as the input form it is given, a function making a batch of
+# calls and the number of calls in the batch
+def cases(game):
+    player = MIN_SIDE if game.min_to_move() else MAX_SIDE
+    bits = game.min_bits if game.min_to_move() else game.max_bits
+    moves = game.moves()
+    phase = 1 if game.max_pieces or game.min_pieces else 2
+
+    def each_move(function):
+        return lambda: [function(move) for move in moves]
+
+    found = [
+        ('child', 'game', each_move(lambda move: game.child(move, player)), len(moves)),
+        ('moves', 'game', game.generate_moves, 1),
+        ('evaluate', 'game', lambda: game.evaluate(player), 1),
+    ]
+
+    for form, locations in (('bits', bits), ('sets', game.geometry.to_locations(bits))):
+        found += [
+            ('phase2_moves', form, lambda locations=locations: game.phase2_moves(locations), 1),
+            ('phase3_moves', form, lambda locations=locations: game.phase3_moves(locations), 1),
+            ('isMill', form, each_move(lambda move, locations=locations: game.isMill(locations, move)), len(moves)),
+            ('has_mill', form, lambda locations=locations: game.has_mill(locations), 1),
+            ('one_to_mill', form, lambda locations=locations: game.one_to_mill(locations, phase), 1),
+            ('blocked_pieces', form, lambda locations=locations: game.blocked_pieces(locations), 1),
+        ]
+
+    return found
+
+
+# Time every function on every reference position, and return the results as a list of records with the time of a
+# single call in nanoseconds
+def run(number=NUMBER, repeat=REPEAT):
+    results = []
+
+    for name in sorted(POSITIONS):
+        game = position(name)
+
+        for function, form, batch, calls in cases(game):
+            # Functions without moves to work on are not timed
+            if not calls:
+                continue
+
+            best = min(Timer(batch).repeat(repeat, number))
+            results.append({'function': function, 'variant': type(game).__name__, 'position': name, 'input': form,
+                            'ns_per_call': round(best / number / calls * 1e9, 1)})
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Time the rules and evaluation functions of the games")
+    parser.add_argument('--number', type=int, default=NUMBER, help="calls of each function in a run")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="runs of which the fastest is kept")
+    parser.add_argument('--output', help="file to write the results to instead of the standard output")
+    args = parser.parse_args()
+
+    report = {'python': sys.version.split()[0], 'number': args.number, 'repeat': args.repeat,
+              'results': run(args.number, args.repeat)}
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,125 @@
+# Purpose: Opening books of the moves to make in the first plies of a game, searched deeply offline and looked up
+#          through a memory-mapped file
+# Citations: Opening book: https://www.chessprogramming.org/Opening_Book
+
+from struct import pack, unpack_from, calcsize
+from mmap import mmap, ACCESS_READ
+from transposition import pack_move, unpack_move
+
+# Games are keyed by the Zobrist key of their canonical form, so that symmetric games share one record, and their
+# moves are stored as made in the canonical form
+
+# Files start with a magic number, the name of the variant and the number of records, followed by the records sorted
+# by key, each a key and a packed move
+MAGIC = b'MORRISOB'
+HEADER = '<8sBI'
+RECORD = '<QI'
+
+# Plies of a game covered by a book unless another number is given
+PLIES = 6
+
+
+class OpeningBook(object):
+    # Open a book file for reading through a memory map
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.memory = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+        magic, length, self.count = unpack_from(HEADER, self.memory)
+        if magic != MAGIC:
+            raise ValueError(path + " is not an opening book")
+
+        offset = calcsize(HEADER)
+        self.name = self.memory[offset:offset + length].decode()
+        self.start = offset + length
+
+    # Close the memory map
+    def close(self):
+        self.memory.close()
+
+    # Return the packed move stored for a key, or None if the book has no record for it, by binary search of the
+    # sorted records
+    def lookup(self, key):
+        size = calcsize(RECORD)
+        low, high = 0, self.count
+
+        while low < high:
+            middle = (low + high) // 2
+            found, code = unpack_from(RECORD, self.memory, self.start + middle * size)
+
+            if found == key:
+                return code
+
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        return None
+
+    # Return the book move of a game, or None if the game is not in the book:
+    # The stored move is mapped back from the canonical form, and checked to be legal in case of a key collision
+    def move(self, game):
+        if game.geometry.name != self.name:
+            raise ValueError("The book is for " + self.name)
+
+        key, symmetry = game.canonical_key()
+        code = self.lookup(key)
+
+        if code is None:
+            return None
+
+        move = game.geometry.transform_move(unpack_move(code), game.geometry.inverses[symmetry])
+        return move if move in game.moves() else None
+
+
+class BookBuilder(object):
+    # Create a builder for the book of a variant's game class, covering a number of plies from the beginning of the
+    # game with the moves found by a search engine
+    def __init__(self, cls, engine, plies=PLIES):
+        self.cls = cls
+        self.engine = engine
+        self.plies = plies
+
+        # Moves of the games searched so far, keyed by their canonical keys
+        self.moves = {}
+
+    # Search the games of the book:
+    # For each player, the games reached by the player making book moves and the opponent making any move are
+    # searched, so that the book answers every opening of the opponent within its plies
+    def build(self):
+        for player in (0, 1):
+            self.expand(self.cls(), 0, player)
+
+    # Search a game reached after a number of plies, and the games it leads to, for the player making book moves
+    def expand(self, game, ply, player):
+        if ply >= self.plies or game.utility() is not None:
+            return
+
+        if ply % 2 == player:
+            key, symmetry = game.canonical_key()
+
+            if key in self.moves:
+                return
+
+            move = self.engine.search(game)
+            self.moves[key] = game.geometry.transform_move(move, symmetry)
+            moves = [move]
+
+        else:
+            moves = game.moves()
+
+        for move in moves:
+            undo = game.make_move(move)
+            self.expand(game, ply + 1, player)
+            game.unmake_move(undo)
+
+    # Write the book to a file
+    def write(self, path):
+        name = self.cls.geometry.name.encode()
+
+        with open(path, 'wb') as file:
+            file.write(pack(HEADER, MAGIC, len(name), len(self.moves)) + name)
+
+            for key in sorted(self.moves):
+                file.write(pack(RECORD, key, pack_move(self.moves[key])))
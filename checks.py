@@ -0,0 +1,285 @@
+# Purpose: Checks of the engine's solved positions, parallel search and batched estimates against plain computations
+#          of the same values: a brute-force search, positions solved one at a time, a serial search and evaluate(),
+#          since the repository has no test suite
+# Citations: Retrograde analysis: https://www.chessprogramming.org/Retrograde_Analysis
+#            Parallel search: https://www.chessprogramming.org/Parallel_Search
+#
+# python checks.py [check ...] [--positions N] [--seed N] [--check]
+#
+# Without a check named, every check is run on a number of random positions
+
+import os
+import random
+from argparse import ArgumentParser
+from batch import evaluator
+from itertools import islice
+from tempfile import TemporaryDirectory
+from endgame import EndgameSolver, EndgameDatabase, DRAW, plies
+from geometry import Geometry
+from morris import MAX_SIDE, MIN_SIDE
+from search import SearchConfig, SearchEngine
+from six_men_morris import SixMensMorris
+from nine_men_morris import NineMensMorris
+from twelve_men_morris import TwelveMensMorris
+from retrograde import passes
+
+# Random positions checked by each check unless another number is given, and the plies searched by brute force from
+# the endgames and from the placement of the pieces, where there are more moves
+POSITIONS = 100
+DEPTH = 5
+PLACEMENT_DEPTH = 4
+
+# Plies searched by the parallel and serial searches compared, the worker processes of the parallel one, and the most
+# random moves made to reach the positions they search
+PARALLEL_DEPTH = 4
+WORKERS = 2
+RANDOM_PLIES = 40
+
+# Pieces per side of the Six Men's Morris endgames checked, and of the smaller board whose placement is checked
+ENDGAME_PIECES = 3
+PLACEMENT_PIECES = 3
+
+
+# Six Men's Morris with fewer pieces to place, small enough to be solved from the empty board in a check
+class SmallSixMensMorris(SixMensMorris):
+    geometry = Geometry("Six Men's Morris with %d pieces" % PLACEMENT_PIECES, 2, PLACEMENT_PIECES, flying=False)
+
+
+# Six Men's Morris with flying, so that the endgames where a player may fly are checked on a small board too
+class FlyingSixMensMorris(SixMensMorris):
+    geometry = Geometry("Six Men's Morris with flying", 2, 6)
+
+
+# Return the outcome of a game for the player to move found by searching every move to a number of plies: 1 for a win
+# within them, -1 for a loss within them and 0 otherwise
+def outcome(game, depth):
+    utility = game.utility()
+
+    if utility is not None:
+        return -utility if game.min_to_move() else utility
+
+    if depth == 0:
+        return 0
+
+    best = -1
+
+    for move in game.moves():
+        undo = game.make_move(move)
+        result = -outcome(game, depth - 1)
+        game.unmake_move(undo)
+
+        if result == 1:
+            return 1
+
+        best = max(best, result)
+
+    return best
+
+
+# Return the outcome a database byte gives within a number of plies, as outcome() finds it
+def expected(value, depth):
+    if value == DRAW or plies(value) > depth:
+        return 0
+
+    return 1 if value & 1 else -1
+
+
+# Check the solved endgames of Six Men's Morris against a brute-force search from random positions, and return the
+# number of positions that disagree
+def check_endgames(positions, generator, depth=DEPTH):
+    solver = EndgameSolver(SixMensMorris)
+    solver.solve(ENDGAME_PIECES)
+    return compare(solver, endgames(solver, generator), positions, depth)
+
+
+# Check the solved placement of the pieces on a smaller Six Men's Morris board against a brute-force search from random
+# positions, and return the number of positions that disagree
+def check_placement(positions, generator, depth=PLACEMENT_DEPTH):
+    solver = EndgameSolver(SmallSixMensMorris)
+    solver.solve_placement()
+    return compare(solver, placements(solver, generator), positions, depth)
+
+
+# Check the endgames solved by NumPy passes against the endgames solved one position at a time, on Six Men's Morris
+# with and without flying, at random positions, and return the number of positions on which they differ. Without NumPy,
+# nothing is checked
+def check_retrograde(positions, generator):
+    if passes(EndgameSolver(SixMensMorris)) is None:
+        print("NumPy is not installed, so there are no passes to check")
+        return 0
+
+    solvers = []
+
+    for cls in (SixMensMorris, FlyingSixMensMorris):
+        pair = (EndgameSolver(cls), EndgameSolver(cls, vectorized=False))
+
+        for solver in pair:
+            solver.solve(ENDGAME_PIECES)
+
+        solvers.append(pair)
+
+    failures = 0
+
+    for i in range(positions):
+        vectorized, single = generator.choice(solvers)
+        entry = generator.choice(sorted(single.tables))
+        index = generator.randrange(len(single.tables[entry]))
+
+        if vectorized.tables[entry][index] != single.tables[entry][index]:
+            print("%s table %r position %d: %d by the passes and %d one position at a time" %
+                  (single.geometry.name, entry, index, vectorized.tables[entry][index], single.tables[entry][index]))
+            failures += 1
+
+    return failures
+
+
+# Return random endgames of Six Men's Morris that are not over, as games
+def endgames(solver, generator):
+    while True:
+        points = generator.sample(range(solver.points), 2 * ENDGAME_PIECES)
+        max_bits = sum(1 << i for i in points[:ENDGAME_PIECES])
+        min_bits = sum(1 << i for i in points[ENDGAME_PIECES:])
+        game = SixMensMorris.from_bits(generator.choice((MAX_SIDE, MIN_SIDE)), 0, 0, max_bits, min_bits)
+
+        if game.utility() is None:
+            yield game
+
+
+# Return random positions of the placement of the pieces that are not over, as games: the player to move has as many
+# pieces left to place as the opponent, or one fewer if Min is to move, and either may have lost pieces to mills
+def placements(solver, generator):
+    pieces = solver.geometry.pieces
+
+    while True:
+        hand = generator.randint(1, pieces)
+        min_moves = generator.random() < 0.5
+        max_hand = hand - 1 if min_moves else hand
+        max_count = generator.randint(0, pieces - max_hand)
+        min_count = generator.randint(0, pieces - hand)
+
+        points = generator.sample(range(solver.points), max_count + min_count)
+        max_bits = sum(1 << i for i in points[:max_count])
+        min_bits = sum(1 << i for i in points[max_count:])
+        last_player = MAX_SIDE if min_moves else None if hand == pieces and not points else MIN_SIDE
+        game = solver.cls.from_bits(last_player, max_hand, hand, max_bits, min_bits)
+
+        if game.utility() is None:
+            yield game
+
+
+# Compare the values of a solver's tables, written to a database file, with a brute-force search on a number of games,
+# and return the number of games on which they disagree
+def compare(solver, games, positions, depth):
+    failures = 0
+
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'solved.db')
+        solver.write(path)
+        database = EndgameDatabase(path)
+
+        for game in islice(games, positions):
+            value = database.lookup_game(game)
+
+            if outcome(game, depth) != expected(value, depth):
+                print("%#x against %#x with %d and %d to place and %s to move: the database has %d" %
+                      (game.max_bits, game.min_bits, game.max_pieces, game.min_pieces,
+                       "Min" if game.min_to_move() else "Max", value))
+                failures += 1
+
+        database.close()
+
+    return failures
+
+
+# Return random games of the given classes that are not over, reached by random moves from the beginning of a game
+def random_games(classes, generator):
+    while True:
+        game = generator.choice(classes)()
+
+        for ply in range(generator.randint(0, RANDOM_PLIES)):
+            if game.utility() is not None:
+                break
+
+            game.make_move(generator.choice(game.moves()))
+
+        if game.utility() is None:
+            yield game
+
+
+# Check the values of parallel root searches against serial searches of random Six and Nine Men's Morris games, and
+# return the number of games on which they disagree
+def check_parallel(positions, generator, depth=PARALLEL_DEPTH):
+    failures = 0
+
+    for game in islice(random_games((SixMensMorris, NineMensMorris), generator), positions):
+        serial = SearchEngine(SearchConfig(depth))
+        parallel = SearchEngine(SearchConfig(depth, workers=WORKERS))
+
+        try:
+            serial.search(game)
+            parallel.search(game)
+
+        finally:
+            parallel.close()
+
+        if serial.root_value != parallel.root_value:
+            print("%s %#x against %#x with %d and %d to place and %s to move: %r serially and %r in parallel" %
+                  (type(game).__name__, game.max_bits, game.min_bits, game.max_pieces, game.min_pieces,
+                   "Min" if game.min_to_move() else "Max", serial.root_value, parallel.root_value))
+            failures += 1
+
+    return failures
+
+
+# Check the batched estimates of random Six, Nine and Twelve Men's Morris games against evaluate() for either player,
+# and return the number of games on which they differ by any bit. Without NumPy, nothing is checked
+def check_batch(positions, generator):
+    if evaluator(SixMensMorris.geometry) is None:
+        print("NumPy is not installed, so there are no batched estimates to check")
+        return 0
+
+    failures = 0
+
+    for game in islice(random_games((SixMensMorris, NineMensMorris, TwelveMensMorris), generator), positions):
+        sides = (MAX_SIDE, MIN_SIDE)
+        rows = [(game.max_bits, game.min_bits, game.max_pieces, game.min_pieces, side.maximizes()) for side in sides]
+        estimates = evaluator(game.geometry).evaluate(type(game), rows)
+
+        for side, estimate in zip(sides, estimates):
+            if estimate != game.evaluate(side):
+                print("%s %#x against %#x with %d and %d to place: %r batched and %r by evaluate() for %s" %
+                      (type(game).__name__, game.max_bits, game.min_bits, game.max_pieces, game.min_pieces, estimate,
+                       game.evaluate(side), "Max" if side.maximizes() else "Min"))
+                failures += 1
+                break
+
+    return failures
+
+
+# Checks by name
+CHECKS = {'endgames': check_endgames, 'placement': check_placement, 'parallel': check_parallel, 'batch': check_batch,
+          'retrograde': check_retrograde}
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Check solved positions, parallel searches and batched estimates against plain "
+                                        "computations")
+    parser.add_argument('checks', nargs='*', help="checks to run, of " + ", ".join(sorted(CHECKS)))
+    parser.add_argument('--positions', type=int, default=POSITIONS, help="random positions checked by each check")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help="fail unless every position agrees")
+    args = parser.parse_args()
+
+    for name in args.checks:
+        if name not in CHECKS:
+            parser.error("unknown check " + name)
+
+    failed = 0
+
+    for name in args.checks or sorted(CHECKS):
+        failures = CHECKS[name](args.positions, random.Random(args.seed))
+        print("%s: %d of %d positions agree" % (name, args.positions - failures, args.positions))
+        failed += failures
+
+    if args.check and failed:
+        raise SystemExit("Checks failed on %d positions" % failed)
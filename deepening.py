@@ -0,0 +1,97 @@
+# Purpose: Iterative deepening of the alpha-beta players' searches within a per-move time or node budget
+# Citations: Iterative deepening: https://www.chessprogramming.org/Iterative_Deepening
+
+from time import time
+
+
+# Raised inside a search once its budget has run out
+class SearchTimeout(Exception):
+    pass
+
+
+class Budget(object):
+    # Track the nodes searched for a move against optional limits on time (in seconds) and nodes:
+    # A search may also be stopped by another process through a shared flag. Processes searching for the same move may
+    # also count their nodes in a shared counter, which the node limit then applies to
+    def __init__(self, stop=None, counter=None):
+        self.nodes = 0
+        self.started = None
+        self.deadline = None
+        self.node_limit = None
+        self.armed = False
+        self.stop = stop
+        self.counter = counter
+
+    # Start counting for a new search, with limits that apply once the budget is armed
+    def start(self, time_limit=None, node_limit=None):
+        self.nodes = 0
+        self.started = time()
+        self.deadline = None if time_limit is None else self.started + time_limit
+        self.node_limit = node_limit
+        self.armed = False
+
+    # Count a searched node, stopping the search if the budget is armed and spent:
+    # The clock, the stop flag and the shared counter are only read every 128 nodes to keep the check cheap
+    def tick(self):
+        self.nodes += 1
+
+        if self.armed:
+            if self.node_limit is not None and self.nodes > self.node_limit:
+                raise SearchTimeout
+
+            if not self.nodes & 127 and ((self.deadline is not None and time() > self.deadline) or
+                                         (self.stop is not None and self.stop.value) or
+                                         (self.counter is not None and self.share(128))):
+                raise SearchTimeout
+
+    # Add a number of nodes to the shared counter and return whether the nodes counted there exceed the node limit
+    def share(self, nodes):
+        with self.counter.get_lock():
+            self.counter.value += nodes
+            total = self.counter.value
+
+        return self.node_limit is not None and total > self.node_limit
+
+    # Return whether either limit has been reached
+    def spent(self):
+        return (self.node_limit is not None and self.nodes >= self.node_limit) or \
+            (self.deadline is not None and time() >= self.deadline)
+
+    # Return whether the time limit would be overrun by the time spent so far grown by a factor
+    def outlasts(self, factor):
+        return self.deadline is not None and (time() - self.started) * factor > self.deadline - self.started
+
+
+# Return the best move for the player to move found by an engine searching one ply deeper at a time, until its
+# maximum depth or its budget is reached:
+# The move of the deepest completed search is returned. Each search is ordered by the best moves of the previous
+# one, which are found in the engine's transposition table. A deeper search takes about the branching factor times as
+# long as the searches before it, so it is not started when that would overrun the time limit
+def deepen(engine, game):
+    config = engine.config
+    budget = engine.budget
+    budget.start(config.time_limit, config.node_limit)
+    best_move = None
+    limit = 0
+
+    while limit < config.depth:
+        limit += 1
+
+        try:
+            best_move = engine.root(game, limit)
+
+        except SearchTimeout:
+            break
+
+        # The first search always completes so that there is a move to make
+        budget.armed = True
+
+        if budget.spent():
+            break
+
+        factor = engine.stats.branching_factor()
+
+        if factor is not None and budget.outlasts(factor):
+            break
+
+    return best_move
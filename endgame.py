@@ -0,0 +1,545 @@
+# Purpose: Databases of solved positions, solved offline by retrograde analysis and probed through a memory-mapped
+#          file: the endgames with a few pieces per side and none left to place, and for small boards the placement
+#          of the pieces too. With NumPy, the endgames are solved by the passes of retrograde.py
+# Citations: Retrograde analysis: https://www.chessprogramming.org/Retrograde_Analysis
+#            Combinatorial number system: https://en.wikipedia.org/wiki/Combinatorial_number_system
+
+from array import array
+from bisect import bisect_left
+from itertools import combinations
+from struct import pack, unpack_from, calcsize
+from mmap import mmap, ACCESS_READ
+from geometry import indices
+
+# Positions are seen from the player to move, as the bit masks of their pieces and of their opponent's pieces and
+# the numbers of pieces each has left to place, since the rules are the same for both players. A table holds the
+# positions with given numbers of pieces to place and on the board for the player to move and for the opponent, one
+# byte each:
+# 0 is a draw, an odd byte is a win for the player to move in that many plies, and an even byte from 2 up is a loss
+# after two plies fewer than its value
+DRAW = 0
+LONGEST = 253
+
+# Value of a won game on the scale of the search, above any estimate of a game that is not over
+WIN = 1000
+
+# Flags of the positions being solved: a move taking a piece does not lose, so the position cannot be lost, and the
+# position is queued to be settled as a win
+SAVED = 1
+WON = 2
+
+# Files start with a magic number, the number of points on the board, the name of the variant and the number of
+# tables, followed by the pieces to place and on the board of the player to move and of the opponent, the offset and
+# the size of each table and the offset of its sets of the player to move's pieces, and then those sets and the tables
+# themselves.
+# Symmetric positions have the same value, so the tables of a file only hold the positions whose pieces of the player
+# to move are the least of their images under the board's symmetries, for any pieces of the opponent. Those sets are
+# stored in increasing order, as 32-bit bit masks, and a table holds the positions of each in turn, in the order of
+# the opponent's pieces' ranks around them. This takes about a sixteenth of the positions of the solver's tables
+MAGIC = b'MORRISEC'
+HEADER = '<8sBH'
+ENTRY = '<BBBBQQQ'
+
+# Binomial coefficients for ranking sets of up to 24 points
+BINOMIAL = [[0] * 25 for n in range(25)]
+for n in range(25):
+    BINOMIAL[n][0] = 1
+    for k in range(1, n + 1):
+        BINOMIAL[n][k] = BINOMIAL[n - 1][k - 1] + BINOMIAL[n - 1][k]
+
+
+# Return the byte of a win in a number of plies
+def win(plies):
+    return min(plies, LONGEST)
+
+
+# Return the byte of a loss in a number of plies
+def loss(plies):
+    return min(plies + 2, LONGEST + 1)
+
+
+# Return the number of plies until the end of a game stored as a byte
+def plies(value):
+    return value if value & 1 else value - 2
+
+
+# Return the value of a byte for the player to move, on the scale of the search:
+# Wins and losses in fewer plies are worth more, but less than the end of the game itself
+def score(value):
+    if value == DRAW:
+        return 0
+
+    if value & 1:
+        return WIN - value / 1000
+
+    return (value - 2) / 1000 - WIN
+
+
+# Return the rank of a set of points among the sets of as many points
+def rank(bits):
+    rank = 0
+
+    for i, point in enumerate(indices(bits)):
+        rank += BINOMIAL[point][i + 1]
+
+    return rank
+
+
+# Return the set of points of a rank among the sets of a number of points, the inverse of rank()
+def unrank(rank, count):
+    bits = 0
+
+    for i in range(count, 0, -1):
+        point = i - 1
+
+        while BINOMIAL[point + 1][i] <= rank:
+            point += 1
+
+        rank -= BINOMIAL[point][i]
+        bits |= 1 << point
+
+    return bits
+
+
+# Return the rank of the opponent's pieces among the points left empty by the pieces of the player to move
+def rank_around(bits, around):
+    rank = 0
+
+    for i, point in enumerate(indices(bits)):
+        rank += BINOMIAL[point - (around & ((1 << point) - 1)).bit_count()][i + 1]
+
+    return rank
+
+
+# Return the number of positions of a table on a board with a number of points
+def table_size(points, own, other):
+    return BINOMIAL[points][own] * BINOMIAL[points - own][other]
+
+
+# Return the index of a position in its table
+def position_index(points, own_bits, other_bits):
+    return rank(own_bits) * BINOMIAL[points - own_bits.bit_count()][other_bits.bit_count()] + \
+        rank_around(other_bits, own_bits)
+
+
+# Return the bit masks of the pieces of the player to move and of the opponent of the position of an index in its
+# table, the inverse of position_index()
+def index_position(points, index, own, other):
+    size = BINOMIAL[points - own][other]
+    own_bits = unrank(index // size, own)
+    empty = [i for i in range(points) if not own_bits & (1 << i)]
+    other_bits = 0
+
+    for i in indices(unrank(index % size, other)):
+        other_bits |= 1 << empty[i]
+
+    return own_bits, other_bits
+
+
+class EndgameDatabase(object):
+    # Open a database file for reading through a memory map
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.memory = mmap(file.fileno(), 0, access=ACCESS_READ)
+
+        magic, self.points, length = unpack_from(HEADER, self.memory)
+        if magic != MAGIC:
+            raise ValueError(path + " is not an endgame database")
+
+        offset = calcsize(HEADER)
+        self.name = self.memory[offset:offset + length].decode()
+        offset += length
+
+        count, = unpack_from('<H', self.memory, offset)
+        offset += 2
+
+        # Offset of each table and its sets of the player to move's pieces, keyed by the pieces to place of the player
+        # to move and of the opponent, and their pieces on the board
+        self.tables = {}
+        loaded = {}
+        for i in range(count):
+            own_hand, other_hand, own, other, start, size, sets = unpack_from(ENTRY, self.memory, offset)
+            offset += calcsize(ENTRY)
+
+            if sets not in loaded:
+                loaded[sets] = array('I', self.memory[sets:sets + size // BINOMIAL[self.points - own][other] * 4])
+
+            self.tables[own_hand, other_hand, own, other] = start, loaded[sets]
+
+    # Close the memory map
+    def close(self):
+        self.memory.close()
+
+    # Return the byte stored for a position of the player to move's pieces and the opponent's, by default with every
+    # piece placed, or None if the database has no table for it. The position must be in its canonical form
+    def lookup(self, own_bits, other_bits, own_hand=0, other_hand=0):
+        own, other = own_bits.bit_count(), other_bits.bit_count()
+        table = self.tables.get((own_hand, other_hand, own, other))
+
+        if table is None:
+            return None
+
+        start, sets = table
+        row = bisect_left(sets, own_bits)
+
+        if row == len(sets) or sets[row] != own_bits:
+            raise ValueError("The position is not in its canonical form")
+
+        return self.memory[start + row * BINOMIAL[self.points - own][other] + rank_around(other_bits, own_bits)]
+
+    # Return the byte of a game that is not over for the player to move if it is in the database, or None otherwise
+    def lookup_game(self, game):
+        if game.geometry.name != self.name:
+            raise ValueError("The database is for " + self.name)
+
+        if game.min_to_move():
+            own_bits, other_bits, own_hand, other_hand = game.min_bits, game.max_bits, game.min_pieces, game.max_pieces
+        else:
+            own_bits, other_bits, own_hand, other_hand = game.max_bits, game.min_bits, game.max_pieces, game.min_pieces
+
+        # An opponent left with two pieces after placing their last one loses after any move
+        if not own_hand and not other_hand and other_bits.bit_count() < 3:
+            return win(1)
+
+        # Finding the canonical form costs a transform per symmetry, which games without a table are spared
+        if (own_hand, other_hand, own_bits.bit_count(), other_bits.bit_count()) not in self.tables:
+            return None
+
+        own_bits, other_bits, symmetry = game.geometry.canonical(own_bits, other_bits)
+        return self.lookup(own_bits, other_bits, own_hand, other_hand)
+
+    # Return the value of a game that is not over for the player to move if it is in the database, or None otherwise
+    def probe(self, game):
+        value = self.lookup_game(game)
+        return None if value is None else score(value)
+
+
+class EndgameSolver(object):
+    # Create a solver for the endgames of a variant's game class, using the rules of its games:
+    # The endgames are solved in NumPy passes over the tables if NumPy is installed, unless the solver is told to solve
+    # one position at a time
+    def __init__(self, cls, vectorized=True):
+        self.cls = cls
+        self.geometry = cls.geometry
+        self.rules = cls.from_bits(None, 0, 0, 0, 0)
+        self.points = self.geometry.size
+        self.vectorized = vectorized
+
+        # Solved tables, keyed by the pieces to place of the player to move and of the opponent, and their pieces on the
+        # board
+        self.tables = {}
+
+    # Return the moves of the player to move, as pairs of the points moved from and to
+    def moves(self, own_bits, other_bits):
+        geometry = self.geometry
+        empty = geometry.full & ~(own_bits | other_bits)
+        moves = []
+
+        for i in indices(own_bits):
+            if own_bits.bit_count() == 3 and geometry.flying:
+                targets = empty
+            else:
+                targets = geometry.neighbours[i] & empty
+
+            for j in indices(targets):
+                moves.append((i, j))
+
+        return moves
+
+    # Return the positions from which the opponent could have moved into a position without forming a mill, as
+    # bit masks of the pieces of the player to move and of the opponent in the earlier position
+    def unmoves(self, own_bits, other_bits):
+        geometry = self.geometry
+        empty = geometry.full & ~(own_bits | other_bits)
+        flying = other_bits.bit_count() == 3 and geometry.flying
+        earlier = []
+
+        for j in indices(other_bits):
+            if self.rules.forms_mill(other_bits, 1 << j):
+                continue
+
+            sources = empty if flying else geometry.neighbours[j] & empty
+
+            for i in indices(sources):
+                earlier.append((other_bits ^ (1 << j) ^ (1 << i), own_bits))
+
+        return earlier
+
+    # Solve the tables of up to a number of pieces for each player, and optionally up to a number of pieces in all,
+    # after the tables with fewer pieces that they reach by taking pieces off the board
+    def solve(self, most, pieces=None):
+        solve_pair = self.solve_pair
+
+        if self.vectorized:
+            # The passes import their module, which imports this one, only when asked for
+            from retrograde import passes
+            found = passes(self)
+
+            if found is not None:
+                solve_pair = found.solve_pair
+
+        for total in range(6, min(2 * most, pieces or 2 * most) + 1):
+            for own in range(3, most + 1):
+                other = total - own
+
+                if own <= other <= most and (0, 0, own, other) not in self.tables:
+                    solve_pair(own, other)
+
+    # Solve the tables of positions with a number of pieces for the player to move and for the opponent, and of the
+    # positions with the numbers swapped, which the moves of one lead to:
+    # Every position is first tallied with its moves. Moves that take a piece off the board lead to tables already
+    # solved, and the others are counted. Positions are then settled in order of their distance to the end of the
+    # game, with each settled position settling the positions that could have moved into it. Positions waiting to be
+    # settled are queued as their indices, and a position is queued as a win again only for a shorter win
+    def solve_pair(self, own, other):
+        points = self.points
+        pairs = [(own, other)] if own == other else [(own, other), (other, own)]
+        starts = {pairs[0]: 0}
+        size = table_size(points, own, other)
+
+        if own != other:
+            starts[pairs[1]] = size
+            size *= 2
+
+        values = bytearray(size)
+        counts = bytearray(size)
+        # Plies to the end of the game of a position's longest loss so far, or of the win it is queued for
+        longest = bytearray(size)
+        flags = bytearray(size)
+
+        # Positions waiting to be settled as wins and as losses, by their distance to the end of the game
+        wins = [array('I') for plies in range(LONGEST + 2)]
+        losses = [array('I') for plies in range(LONGEST + 2)]
+
+        # Return the index of a position in the pair of tables
+        def index(own_bits, other_bits):
+            return starts[own_bits.bit_count(), other_bits.bit_count()] + \
+                position_index(points, own_bits, other_bits)
+
+        # Return the position of an index in the pair of tables
+        def position(k):
+            if own != other and k >= starts[pairs[1]]:
+                return index_position(points, k - starts[pairs[1]], *pairs[1])
+
+            return index_position(points, k, *pairs[0])
+
+        # Queue a position as a win in a number of plies, unless it is queued for a win as short
+        def queue_win(k, distance):
+            distance = min(distance, LONGEST + 1)
+
+            if flags[k] & WON and longest[k] <= distance:
+                return
+
+            flags[k] |= WON
+            longest[k] = distance
+            wins[distance].append(k)
+
+        for pair in pairs:
+            own_count, other_count = pair
+            smaller = self.tables.get((0, 0, other_count - 1, own_count))
+
+            for own_points in combinations(range(points), own_count):
+                own_bits = sum(1 << i for i in own_points)
+                rest = [i for i in range(points) if not own_bits & (1 << i)]
+
+                for other_points in combinations(rest, other_count):
+                    other_bits = sum(1 << i for i in other_points)
+                    k = index(own_bits, other_bits)
+                    count = 0
+                    fastest = None
+
+                    for i, j in self.moves(own_bits, other_bits):
+                        moved = own_bits ^ (1 << i) ^ (1 << j)
+
+                        if not self.rules.forms_mill(moved, 1 << j):
+                            count += 1
+                            continue
+
+                        # Taking the opponent down to two pieces wins at once
+                        if other_count == 3:
+                            flags[k] |= SAVED
+                            fastest = 1
+                            continue
+
+                        # Each of the opponent's pieces that may be taken leads to a position of its own
+                        for t in self.rules.capture_targets(moved, other_bits):
+                            value = smaller[position_index(points, other_bits ^ (1 << t), moved)]
+
+                            if value & 1:
+                                longest[k] = max(longest[k], min(plies(value) + 1, LONGEST + 1))
+                                continue
+
+                            flags[k] |= SAVED
+
+                            if value != DRAW and (fastest is None or plies(value) + 1 < fastest):
+                                fastest = plies(value) + 1
+
+                    counts[k] = count
+
+                    if fastest is not None:
+                        queue_win(k, fastest)
+
+                    elif count == 0 and not flags[k] & SAVED:
+                        losses[longest[k]].append(k)
+
+        for distance in range(LONGEST + 2):
+            for won, queue in ((True, wins[distance]), (False, losses[distance])):
+                for k in queue:
+                    if values[k]:
+                        continue
+
+                    values[k] = win(distance) if won else loss(distance)
+
+                    for earlier in self.unmoves(*position(k)):
+                        e = index(*earlier)
+
+                        if values[e]:
+                            continue
+
+                        # A move into a lost position wins
+                        if not won:
+                            queue_win(e, distance + 1)
+                            continue
+
+                        # Positions queued as wins need no more counting
+                        if flags[e] & WON:
+                            continue
+
+                        # A position whose moves all lead to wins for the opponent is lost
+                        longest[e] = max(longest[e], min(distance + 1, LONGEST + 1))
+                        counts[e] -= 1
+
+                        if counts[e] == 0 and not flags[e] & SAVED:
+                            losses[longest[e]].append(e)
+
+            wins[distance] = losses[distance] = None
+
+        for pair in pairs:
+            start = starts[pair]
+            self.tables[(0, 0) + pair] = values[start:start + table_size(points, *pair)]
+
+    # Return the byte of a position solved before, for the player to move
+    def value(self, own_bits, other_bits, own_hand, other_hand):
+        # Once every piece is placed, a player left with two pieces has lost, and so has a player without a move
+        if not own_hand and not other_hand:
+            if own_bits.bit_count() < 3:
+                return loss(0)
+
+            if other_bits.bit_count() < 3:
+                return win(1) if self.moves(own_bits, other_bits) else loss(0)
+
+        table = self.tables[own_hand, other_hand, own_bits.bit_count(), other_bits.bit_count()]
+        return table[position_index(self.points, own_bits, other_bits)]
+
+    # Solve every position of the game, from the endgames with every piece placed back to the empty board:
+    # Every placement leaves a piece fewer to place, so the positions with a number of pieces left to place only lead
+    # to positions solved before them
+    def solve_placement(self):
+        self.solve(self.geometry.pieces)
+
+        for hand in range(1, self.geometry.pieces + 1):
+            self.solve_hand(hand, hand - 1)
+            self.solve_hand(hand, hand)
+
+    # Solve the positions with a number of pieces left to place for the player to move and for the opponent, for any
+    # number of pieces on the board
+    def solve_hand(self, own_hand, other_hand):
+        points = self.points
+        pieces = self.geometry.pieces
+        empty = self.geometry.full
+
+        for own in range(pieces - own_hand + 1):
+            for other in range(pieces - other_hand + 1):
+                table = bytearray(table_size(points, own, other))
+
+                for own_points in combinations(range(points), own):
+                    own_bits = sum(1 << i for i in own_points)
+                    rest = [i for i in range(points) if not own_bits & (1 << i)]
+
+                    for other_points in combinations(rest, other):
+                        other_bits = sum(1 << i for i in other_points)
+                        fastest = None
+                        longest = 0
+                        drawn = False
+
+                        for i in indices(empty & ~(own_bits | other_bits)):
+                            placed = own_bits | (1 << i)
+                            takes = [other_bits]
+
+                            # Check for mills as a result of the placement and take each of the opponent's pieces that
+                            # may be taken in turn
+                            if other_bits and self.rules.forms_mill(placed, 1 << i):
+                                takes = [other_bits ^ (1 << t) for t in self.rules.capture_targets(placed, other_bits)]
+
+                            for taken in takes:
+                                value = self.value(taken, placed, other_hand, own_hand - 1)
+
+                                if value == DRAW:
+                                    drawn = True
+
+                                elif value & 1:
+                                    longest = max(longest, plies(value) + 1)
+
+                                elif fastest is None or plies(value) + 1 < fastest:
+                                    fastest = plies(value) + 1
+
+                        if fastest is not None:
+                            value = win(fastest)
+
+                        elif drawn:
+                            value = DRAW
+
+                        else:
+                            value = loss(longest)
+
+                        table[position_index(points, own_bits, other_bits)] = value
+
+                self.tables[own_hand, other_hand, own, other] = table
+
+    # Return the sets of a number of points that are the least of their images under every symmetry of the board, in
+    # increasing order
+    def least_sets(self, count):
+        geometry = self.geometry
+        sets = []
+
+        for chosen in combinations(range(self.points), count):
+            bits = sum(1 << i for i in chosen)
+
+            if all(geometry.transform(bits, symmetry) >= bits for symmetry in range(1, len(geometry.symmetries))):
+                sets.append(bits)
+
+        return array('I', sorted(sets))
+
+    # Write the solved tables to a database file, keeping the positions in their canonical form
+    def write(self, path):
+        name = self.geometry.name.encode()
+        entries = sorted(self.tables)
+        sets = {own: self.least_sets(own) for own in sorted({entry[2] for entry in entries})}
+        offset = calcsize(HEADER) + len(name) + 2 + len(entries) * calcsize(ENTRY)
+
+        # Offsets of the sets of each number of pieces, written after the entries
+        starts = {}
+        for own in sets:
+            starts[own] = offset
+            offset += len(sets[own]) * sets[own].itemsize
+
+        # Rows of each table for the least sets of the player to move's pieces, in the order of the sets
+        tables = {}
+        for entry in entries:
+            own, other = entry[2:]
+            width = BINOMIAL[self.points - own][other]
+            table = self.tables[entry]
+            tables[entry] = b''.join(table[rank(bits) * width:(rank(bits) + 1) * width] for bits in sets[own])
+
+        with open(path, 'wb') as file:
+            file.write(pack(HEADER, MAGIC, self.points, len(name)) + name + pack('<H', len(entries)))
+
+            for entry in entries:
+                file.write(pack(ENTRY, *entry, offset, len(tables[entry]), starts[entry[2]]))
+                offset += len(tables[entry])
+
+            for own in sets:
+                file.write(sets[own].tobytes())
+
+            for entry in entries:
+                file.write(tables[entry])
@@ -3,6 +3,7 @@
 # Citations: Artifical Intelligence Text Book
 
 from time import sleep, time
+from profiling import from_environment
 # Superclass for games
 class Game(object):
     # Check for game equivalence with another
@@ -35,12 +36,14 @@ class Game(object):
         raise NotImplementedError
 
     # Play the game
+    # With profiling turned on by the environment, the profile of each move is printed after it
     def play(self, max_player, min_player, interval=1):
         print("Playing game...")
         self.display()
         moves = 0
         game = self
         player, opponent = max_player, min_player
+        profiler = from_environment([type(self)])
 
         while game.utility() is None:
             start = time()
@@ -56,9 +59,16 @@ class Game(object):
             game = game.child(move, player)
             game.display()
             moves += 1
+
+            if profiler is not None:
+                print(profiler.report("Profile of move %d:" % moves))
+
             sleep(interval)
             player, opponent = opponent, player
 
+        if profiler is not None:
+            profiler.stop()
+
         print("Game over with utility", game.utility(), "after", moves, "moves")
 
 # Superclass for players
@@ -69,4 +79,8 @@ class Player(object):
 
     # Return whether this player wants to maximize utility
     def maximizes(self):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    # Release what the player holds once it is done playing
+    def close(self):
+        pass
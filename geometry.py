@@ -0,0 +1,226 @@
+# Purpose: Board geometry tables for Six, Nine and Twelve Men's Morris, precomputed once per variant
+# Citations: Nine Men's Morris Game Description: https://en.wikipedia.org/wiki/Nine_men%27s_morris
+#            Zobrist hashing: https://www.chessprogramming.org/Zobrist_Hashing
+#            Symmetries: https://www.chessprogramming.org/Symmetry
+
+from random import Random
+
+# A location (square, position in square) is stored as bit square * 8 + position of an integer bit mask.
+# Squares are numbered from the outside in, and positions run clockwise from a square's top left corner,
+# so even positions are corners and odd positions are the midpoints of a square's sides
+
+# Point indices of the set bits of every 12-bit chunk, so that the bits of a board can be listed with two lookups
+LOW_INDICES = [tuple(i for i in range(12) if chunk & (1 << i)) for chunk in range(1 << 12)]
+HIGH_INDICES = [tuple(i + 12 for i in chunk) for chunk in LOW_INDICES]
+
+
+# Return the point indices of the set bits of a board with up to 24 points
+def indices(bits):
+    return LOW_INDICES[bits & 0xFFF] + HIGH_INDICES[bits >> 12]
+
+
+# Return the bit of a location
+def bit(sq, in_sq):
+    return 1 << (sq * 8 + in_sq)
+
+
+# Return the bit mask of a collection of locations
+def to_bits(locations):
+    # Bit masks are used as they are
+    if isinstance(locations, int):
+        return locations
+
+    bits = 0
+    for sq, in_sq in locations:
+        bits |= 1 << (sq * 8 + in_sq)
+
+    return bits
+
+
+class Geometry(object):
+    # Build the tables of a board with a number of nested squares:
+    # Midpoints of the squares' sides are connected, and corners too if the board has diagonals.
+    # Players start with a number of pieces and may fly once they are down to three pieces if the variant allows it
+    def __init__(self, name, squares, pieces, diagonals=False, flying=True):
+        self.name = name
+        self.squares = squares
+        self.pieces = pieces
+        self.diagonals = diagonals
+        self.flying = flying
+
+        self.points = [(x, y) for x in range(squares) for y in range(8)]
+        self.size = len(self.points)
+        self.full = (1 << self.size) - 1
+
+        # Adjacent locations of every point as a bit mask
+        self.neighbours = []
+        for x, y in self.points:
+            adjacent = bit(x, (y - 1) % 8) | bit(x, (y + 1) % 8)
+
+            # Lines across the squares join midpoints, and corners on boards with diagonals
+            if y % 2 == 1 or diagonals:
+                for sq in (x - 1, x + 1):
+                    if 0 <= sq < squares:
+                        adjacent |= bit(sq, y)
+
+            self.neighbours.append(adjacent)
+
+        # Mill lines as bit masks: three points along each side of each square...
+        self.mills = [bit(x, y) | bit(x, y + 1) | bit(x, (y + 2) % 8) for x in range(squares) for y in range(0, 8, 2)]
+
+        # ...and three points across the squares, where the board has three of them
+        if squares == 3:
+            across = range(1, 8, 2) if not diagonals else range(8)
+            self.mills += [bit(0, y) | bit(1, y) | bit(2, y) for y in across]
+
+        # Mill lines passing through each point, as bit masks and as sets of locations
+        self.point_mills = [tuple(line for line in self.mills if line & (1 << i)) for i in range(self.size)]
+        self.point_mill_sets = [tuple(frozenset(self.to_locations(line)) for line in lines) for lines in self.point_mills]
+
+        # Every pair of points on a mill line with the point that completes it, and the points from which a piece
+        # could move into the completing point without breaking the pair
+        self.mill_pairs = []
+        for line in self.mills:
+            for i in indices(line):
+                self.mill_pairs.append((line ^ (1 << i), 1 << i, self.neighbours[i] & ~line))
+
+        # The same pairs for each mill line, keyed by the bit mask of the pair
+        self.line_pairs = [{pair: (space, reach) for pair, space, reach in self.mill_pairs if pair & line == pair}
+                           for line in self.mills]
+
+        # Mill lines and points whose tallies may change when the points of a bit mask change, filled in as needed
+        self.touched_cache = {}
+
+        # Four tuples for moving a piece from one point to another, built once instead of for every move
+        self.moves = [[self.points[i] + self.points[j] for j in range(self.size)] for i in range(self.size)]
+
+        # Random 64-bit Zobrist keys for a piece of each player on every point, for each number of pieces a player
+        # has left to place, and for Min being the player to move. They are seeded by the variant's name so that
+        # keys are the same in every run
+        rng = Random(name)
+        self.max_keys = [rng.getrandbits(64) for i in range(self.size)]
+        self.min_keys = [rng.getrandbits(64) for i in range(self.size)]
+        self.max_hand_keys = [rng.getrandbits(64) for i in range(pieces + 1)]
+        self.min_hand_keys = [rng.getrandbits(64) for i in range(pieces + 1)]
+        self.min_to_move_key = rng.getrandbits(64)
+
+        # Symmetries of the board as permutations of the point indices: the four rotations, each of them mirrored, and
+        # all of those with the squares swapped from the outside in. Only those mapping mill lines and adjacent points
+        # onto mill lines and adjacent points are kept, and the identity comes first
+        self.symmetries = []
+        for swap in (False, True):
+            for mirror in (False, True):
+                for turn in range(4):
+                    permutation = []
+                    for x, y in self.points:
+                        if mirror:
+                            y = (2 - y) % 8
+
+                        if swap:
+                            x = squares - 1 - x
+
+                        permutation.append(x * 8 + (y + 2 * turn) % 8)
+
+                    if self.preserves(permutation):
+                        self.symmetries.append(permutation)
+
+        self.inverses = [self.symmetries.index([permutation.index(i) for i in range(self.size)])
+                         for permutation in self.symmetries]
+
+        # Images of the 8 points of each square under each symmetry, for every combination of pieces on the square
+        self.symmetry_tables = []
+        for permutation in self.symmetries:
+            tables = []
+            for sq in range(squares):
+                tables.append([sum(1 << permutation[sq * 8 + i] for i in range(8) if chunk & (1 << i))
+                               for chunk in range(256)])
+
+            self.symmetry_tables.append(tables)
+
+    # Return whether a permutation of the point indices maps mill lines onto mill lines and adjacent points onto
+    # adjacent points
+    def preserves(self, permutation):
+        def image(bits):
+            return sum(1 << permutation[i] for i in indices(bits))
+
+        return {image(line) for line in self.mills} == set(self.mills) and \
+            all(image(self.neighbours[i]) == self.neighbours[permutation[i]] for i in range(self.size))
+
+    # Return the image of a bit mask under a symmetry, given by its index
+    def transform(self, bits, symmetry):
+        tables = self.symmetry_tables[symmetry]
+        image = 0
+
+        for table in tables:
+            image |= table[bits & 0xFF]
+            bits >>= 8
+
+        return image
+
+    # Return the image of a move, or None, under a symmetry
+    def transform_move(self, move, symmetry):
+        if move is None:
+            return None
+
+        permutation = self.symmetries[symmetry]
+        image = ()
+
+        for k in range(0, len(move), 2):
+            image += self.points[permutation[move[k] * 8 + move[k + 1]]]
+
+        return image
+
+    # Return the canonical form of a position, the least of its images under every symmetry as the bit masks of
+    # Max's and Min's pieces, and the symmetry mapping the position onto it
+    def canonical(self, max_bits, min_bits):
+        best = (max_bits, min_bits)
+        best_symmetry = 0
+
+        for symmetry in range(1, len(self.symmetries)):
+            image = (self.transform(max_bits, symmetry), self.transform(min_bits, symmetry))
+
+            if image < best:
+                best = image
+                best_symmetry = symmetry
+
+        return best + (best_symmetry,)
+
+    # Return the set of locations of a bit mask
+    def to_locations(self, bits):
+        return {self.points[i] for i in indices(bits)}
+
+    # Return the indices of the mill lines and the bit mask of the points whose tallies may change when the points
+    # of a bit mask change: those are the changed points and their neighbours, and the lines through any of them
+    def touched(self, changed):
+        touched = self.touched_cache.get(changed)
+
+        if touched is None:
+            near = changed
+            for i in indices(changed):
+                near |= self.neighbours[i]
+
+            lines = tuple(k for k, line in enumerate(self.mills) if line & near)
+            touched = self.touched_cache[changed] = (lines, near)
+
+        return touched
+
+    # Return the Zobrist key of a position
+    def key(self, max_bits, min_bits, max_pieces, min_pieces, min_to_move):
+        key = self.max_hand_keys[max_pieces] ^ self.min_hand_keys[min_pieces]
+
+        for i in indices(max_bits):
+            key ^= self.max_keys[i]
+
+        for i in indices(min_bits):
+            key ^= self.min_keys[i]
+
+        if min_to_move:
+            key ^= self.min_to_move_key
+
+        return key
+
+
+# The tables of each variant
+SIX = Geometry("Six Men's Morris", 2, 6, flying=False)
+NINE = Geometry("Nine Men's Morris", 3, 9)
+TWELVE = Geometry("Twelve Men's Morris", 3, 12, diagonals=True)
@@ -0,0 +1,91 @@
+# Purpose: Lazy SMP search, with helper processes searching the same game at staggered depths and sharing only a
+#          transposition table in shared memory
+# Citations: Lazy SMP: https://www.chessprogramming.org/Lazy_SMP
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+from transposition import SharedTranspositionTable
+from deepening import SearchTimeout, deepen
+from parallel import pack, unpack
+from stats import SearchStats
+from copy import copy
+
+# Search engine of a helper process
+helper_engine = None
+
+
+# Set up a helper process with its own engine, configured like the engine it helps, attached to the shared table
+# and stopped by the shared flag
+def start_helper(engine_class, config, table_name, stop):
+    global helper_engine
+    config = copy(config)
+    config.workers = 1
+    config.smp = False
+    helper_engine = engine_class(config, SharedTranspositionTable(config.table_size, table_name))
+    helper_engine.budget.stop = stop
+
+
+# Search a packed game in a helper, one ply deeper at a time up to a depth, until it is stopped or out of time:
+# Odd helpers start a ply deeper than even ones, so that the helpers fill the table for different depths.
+# Return the nodes searched
+def help_search(state, index, generation, time_left, depth):
+    engine = helper_engine
+    engine.table.generation = generation
+    engine.ordering.new_search()
+    engine.stats = SearchStats()
+
+    budget = engine.budget
+    budget.start(time_left)
+    budget.armed = True
+
+    game = unpack(state)
+    limit = index % 2
+
+    while limit < depth:
+        limit += 1
+
+        try:
+            engine.root(game, limit)
+
+        except SearchTimeout:
+            break
+
+    return budget.nodes
+
+
+class LazySMP(object):
+    # Create a pool of helper processes for an engine whose table is shared
+    def __init__(self, engine, workers):
+        self.workers = workers
+        self.stop = Value('b', 0, lock=False)
+        self.executor = ProcessPoolExecutor(workers - 1, initializer=start_helper,
+                                            initargs=(type(engine), engine.config, engine.table.name, self.stop))
+
+    # Start a new search for a move
+    def new_search(self):
+        pass
+
+    # Stop the helper processes
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    # Return the best move for the player to move in a game, searched by an engine with the help of the pool:
+    # The engine deepens its own search as usual while the helpers search the same game. Once it is done, the
+    # helpers are stopped and the move of the engine's deepest completed search is made
+    def search(self, engine, game):
+        config = engine.config
+        self.stop.value = 0
+
+        state = pack(game)
+        futures = [self.executor.submit(help_search, state, index, engine.table.generation, config.time_limit,
+                                        config.depth) for index in range(1, self.workers)]
+
+        try:
+            move = deepen(engine, game)
+
+        finally:
+            self.stop.value = 1
+            nodes = sum(future.result() for future in futures)
+
+        engine.budget.nodes += nodes
+        return move
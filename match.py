@@ -0,0 +1,202 @@
+# Purpose: Headless matches between two search engine configurations, played over a pool of worker processes, with
+#          the results, an Elo estimate and the time taken per move
+# Citations: Elo rating system: https://en.wikipedia.org/wiki/Elo_rating_system
+#            Engine testing: https://www.chessprogramming.org/Engine_Testing
+#
+# python match.py variant first second [--games N] [--workers N] [--openings PLIES] [--move-limit MOVES] [--seed N]
+#
+# Engines are given as comma separated search settings, for example "depth=4" against "time_limit=0.5,symmetry=1".
+# Setting MORRIS_PROFILE profiles every move, as described in profiling.py
+
+from concurrent.futures import ProcessPoolExecutor
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+from math import log10, sqrt, inf
+from search import SearchConfig, SearchEngine
+from profiling import from_environment
+from six_men_morris import SixMensMorris
+from nine_men_morris import NineMensMorris
+from twelve_men_morris import TwelveMensMorris
+
+# Games of each variant by name
+VARIANTS = {'six': SixMensMorris, 'nine': NineMensMorris, 'twelve': TwelveMensMorris}
+
+# Random plies played at the beginning of each pair of games, and the moves after which a game is drawn
+OPENINGS = 2
+MOVE_LIMIT = 200
+
+
+# Return the game of a variant after a number of random plies, the same for both games of a pair
+def opening(cls, plies, seed, pair):
+    rng = Random("%d-%d" % (seed, pair))
+    game = cls()
+
+    for ply in range(plies):
+        if game.utility() is not None:
+            break
+
+        game.make_move(rng.choice(game.moves()))
+
+    return game
+
+
+# Play a game of a match in a worker process and return its utility for the first engine, the number of moves made
+# and the times taken by each engine for its moves:
+# The engines take turns as Max in every other game, and each pair of games starts from the same opening. A game still
+# going after the move limit is a draw. With profiling turned on by the environment, the profile of each move is
+# printed after it
+def play_game(cls, first, second, index, openings, move_limit, seed):
+    swapped = index % 2 == 1
+    engines = [SearchEngine(second), SearchEngine(first)] if swapped else [SearchEngine(first), SearchEngine(second)]
+    times = ([], [])
+    game = opening(cls, openings, seed, index // 2)
+    moves = 0
+    profiler = from_environment([cls])
+
+    try:
+        while game.utility() is None and moves < move_limit:
+            side = 1 if game.min_to_move() else 0
+            start = perf_counter()
+            move = engines[side].search(game)
+            times[side ^ swapped].append(perf_counter() - start)
+
+            game.make_move(move)
+            moves += 1
+
+            if profiler is not None:
+                print(profiler.report("Profile of game %d, move %d:" % (index + 1, moves)), flush=True)
+
+    finally:
+        for engine in engines:
+            engine.close()
+
+        if profiler is not None:
+            profiler.stop()
+
+    utility = game.utility() or 0
+    return -utility if swapped else utility, moves, times
+
+
+class MatchResult(object):
+    # Start with no games played
+    def __init__(self):
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.moves = 0
+        self.times = ([], [])
+
+    # Count a game played, as returned by play_game
+    def add(self, result):
+        utility, moves, times = result
+
+        if utility > 0:
+            self.wins += 1
+        elif utility < 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+        self.moves += moves
+        for side in (0, 1):
+            self.times[side].extend(times[side])
+
+    # Return the number of games played
+    def games(self):
+        return self.wins + self.losses + self.draws
+
+    # Return the first engine's score, a win counting 1 and a draw a half
+    def score(self):
+        return (self.wins + self.draws / 2) / self.games()
+
+    # Return the Elo difference of the first engine over the second that the score suggests, and its margin at a
+    # confidence level of about 95%, from the deviation of the scores of the games
+    def elo(self):
+        games = self.games()
+        score = self.score()
+        deviation = sqrt((self.wins * (1 - score) ** 2 + self.losses * score ** 2 +
+                          self.draws * (0.5 - score) ** 2) / games)
+        margin = 1.96 * deviation / sqrt(games)
+
+        # The margin is unbounded once either end of the score's interval is a certain result
+        low, high = elo(score - margin), elo(score + margin)
+        return elo(score), inf if low == -inf or high == inf else (high - low) / 2
+
+    # Return the mean and longest time taken for a move by an engine, 0 for the first and 1 for the second
+    def move_times(self, side):
+        times = self.times[side]
+
+        if not times:
+            return 0, 0
+
+        return sum(times) / len(times), max(times)
+
+
+# Return the Elo difference expected from a score
+def elo(score):
+    if score <= 0:
+        return -inf
+
+    if score >= 1:
+        return inf
+
+    return 400 * log10(score / (1 - score))
+
+
+# Play a match of a number of games between two search configurations on a variant's game class, over a pool of
+# worker processes, and return its result for the first engine
+def run_match(cls, first, second, games, workers=1, openings=OPENINGS, move_limit=MOVE_LIMIT, seed=0):
+    result = MatchResult()
+
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(play_game, cls, first, second, index, openings, move_limit, seed)
+                   for index in range(games)]
+
+        for future in futures:
+            result.add(future.result())
+
+    return result
+
+
+# Return the search configuration given by comma separated settings, such as "depth=4,symmetry=1"
+def parse_config(settings):
+    config = SearchConfig()
+    options = {}
+
+    for setting in filter(None, settings.split(',')):
+        name, value = setting.split('=')
+
+        if not hasattr(config, name):
+            raise ValueError("Unknown search setting " + name)
+
+        options[name] = value if name in ('endgames', 'book') else float(value) if '.' in value else int(value)
+
+    return SearchConfig(**options)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Play a headless match between two search engine configurations")
+    parser.add_argument('variant', choices=sorted(VARIANTS))
+    parser.add_argument('first', help="settings of the first engine, such as depth=4")
+    parser.add_argument('second', help="settings of the second engine")
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--openings', type=int, default=OPENINGS, help="random plies at the start of each pair")
+    parser.add_argument('--move-limit', type=int, default=MOVE_LIMIT, help="moves after which a game is drawn")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = perf_counter()
+    result = run_match(VARIANTS[args.variant], parse_config(args.first), parse_config(args.second), args.games,
+                       args.workers, args.openings, args.move_limit, args.seed)
+    difference, margin = result.elo()
+
+    print("Games:", result.games(), "in", round(perf_counter() - start, 2), "seconds,",
+          round(result.moves / result.games(), 1), "moves per game")
+    print("First engine: +%d -%d =%d, score %.3f" % (result.wins, result.losses, result.draws, result.score()))
+    print("Elo difference: %.1f +/- %.1f" % (difference, margin))
+
+    for side, settings in enumerate((args.first, args.second)):
+        mean, longest = result.move_times(side)
+        print("%s: %.4f seconds per move on average, %.4f at most" % (settings or "default", mean, longest))
@@ -0,0 +1,666 @@
+# Purpose: Bitboard rules shared by the Six, Nine and Twelve Men's Morris games
+# Citations: Nine Men's Morris Game Description: https://en.wikipedia.org/wiki/Nine_men%27s_morris
+
+from framework import Game, Player
+from operator import mul
+from geometry import NINE, indices, to_bits
+
+# Running tallies of the evaluation features are packed into integers, with 8 bits for each count:
+# For each mill line, a mill (bit 0), an open pair (bit 8) and an open pair that another piece could move to complete
+# (bit 16) of Max's, and the same of Min's shifted by 24 bits. Summing the tallies of all lines keeps each count in
+# its own byte. Blocked pieces are counted in bits 0 (Max) and 8 (Min)
+MIN_SHIFT = 24
+
+
+# Return the tally of a mill line, given by its index, for the pieces of both players
+def line_tally(geometry, k, max_bits, min_bits):
+    line = geometry.mills[k]
+    pairs = geometry.line_pairs[k]
+    empty = ~(max_bits | min_bits)
+    tally = 0
+
+    own = line & max_bits
+    if own == line:
+        tally = 1
+
+    else:
+        pair = pairs.get(own)
+        if pair is not None and pair[0] & empty:
+            tally = 0x10100 if pair[1] & max_bits else 0x100
+
+    own = line & min_bits
+    if own == line:
+        tally |= 1 << MIN_SHIFT
+
+    else:
+        pair = pairs.get(own)
+        if pair is not None and pair[0] & empty:
+            tally |= (0x10100 if pair[1] & min_bits else 0x100) << MIN_SHIFT
+
+    return tally
+
+
+# Return the tally of blocked pieces among the points of a bit mask
+def blocked_tally(geometry, points, max_bits, min_bits):
+    neighbours = geometry.neighbours
+    tally = 0
+
+    for i in indices(points & max_bits):
+        if not neighbours[i] & ~max_bits:
+            tally += 1
+
+    for i in indices(points & min_bits):
+        if not neighbours[i] & ~min_bits:
+            tally += 0x100
+
+    return tally
+
+
+class Morris(Game):
+    # Tables of the board the game is played on
+    geometry = NINE
+
+    # Create a game object:
+    # The board starts empty with no players yet and each player having the variant's pieces to use with 0 on the board
+    def __init__(self, board=None, last_player=None, max_pieces=None, min_pieces=None, max_loc=set(), min_loc=set()):
+        self.last_player = last_player
+        self.max_pieces = self.geometry.pieces if max_pieces is None else max_pieces
+        self.min_pieces = self.geometry.pieces if min_pieces is None else min_pieces
+
+        # The pieces of each player are kept as bit masks, with pieces marked on a given board included
+        self.max_bits = to_bits(max_loc)
+        self.min_bits = to_bits(min_loc)
+
+        for x, row in enumerate(board or []):
+            for y, cell in enumerate(row):
+                if cell == 'A':
+                    self.max_bits |= 1 << (x * 8 + y)
+
+                elif cell == 'I':
+                    self.min_bits |= 1 << (x * 8 + y)
+
+        # Zobrist key and evaluation tallies of the position, updated move by move
+        self.key = self.geometry.key(self.max_bits, self.min_bits, self.max_pieces, self.min_pieces,
+                                     self.min_to_move())
+        self.tally()
+
+        # List of possible moves, generated when first asked for
+        self.move_list = None
+
+    # Create a game object directly from bit masks, skipping the conversion of boards and location sets:
+    # The key and tallies (line tallies, line total, blocked total) are computed unless they are given, and so is the
+    # list of possible moves
+    @classmethod
+    def from_bits(cls, last_player, max_pieces, min_pieces, max_bits, min_bits, key=None, tallies=None,
+                  move_list=None):
+        game = cls.__new__(cls)
+        game.last_player = last_player
+        game.max_pieces = max_pieces
+        game.min_pieces = min_pieces
+        game.max_bits = max_bits
+        game.min_bits = min_bits
+        game.move_list = move_list
+        game.key = key if key is not None else \
+            cls.geometry.key(max_bits, min_bits, max_pieces, min_pieces, game.min_to_move())
+
+        if tallies is None:
+            game.tally()
+        else:
+            game.tallies, game.line_total, game.blocked_total = tallies
+
+        return game
+
+    # Count the evaluation features of the position from scratch
+    def tally(self):
+        geometry = self.geometry
+        self.tallies = [line_tally(geometry, k, self.max_bits, self.min_bits) for k in range(len(geometry.mills))]
+        self.line_total = sum(self.tallies)
+        self.blocked_total = blocked_tally(geometry, geometry.full, self.max_bits, self.min_bits)
+
+    # Return the running totals of the evaluation features:
+    # Mills, open pairs, open pairs that another piece could move to complete, and blocked pieces for Max and Min
+    def totals(self):
+        lines, blocked = self.line_total, self.blocked_total
+        return (lines & 0xFF, (lines >> 24) & 0xFF, (lines >> 8) & 0xFF, (lines >> 32) & 0xFF,
+                (lines >> 16) & 0xFF, (lines >> 40) & 0xFF, blocked & 0xFF, blocked >> 8)
+
+    # Return whether Min is the player to move, which is the case once Max has made the last move
+    def min_to_move(self):
+        return self.last_player is not None and self.last_player.maximizes()
+
+    # Return whether the player to move places a piece rather than moving one, which is the case while they still
+    # have pieces to place
+    def placing(self):
+        return (self.min_pieces if self.min_to_move() else self.max_pieces) > 0
+
+    # Views of the bitboards in the board, location and space representations used by the rest of the game
+    @property
+    def board(self):
+        board = [[' ' for x in range(8)] for y in range(self.geometry.squares)]
+
+        for i in indices(self.max_bits):
+            board[i >> 3][i & 7] = 'A'
+
+        for i in indices(self.min_bits):
+            board[i >> 3][i & 7] = 'I'
+
+        return board
+
+    @property
+    def max_loc(self):
+        return self.geometry.to_locations(self.max_bits)
+
+    @property
+    def min_loc(self):
+        return self.geometry.to_locations(self.min_bits)
+
+    @property
+    def spaces(self):
+        return self.geometry.to_locations(self.empty_bits())
+
+    # Return the bit mask of the empty points on the board
+    def empty_bits(self):
+        return self.geometry.full & ~(self.max_bits | self.min_bits)
+
+    # Check for game equivalence with another:
+    # This means the same number of pieces for each player, the same board configuration and the same player to move
+    def __eq__(self, other):
+        return self.max_bits == other.max_bits and self.min_bits == other.min_bits and \
+            self.max_pieces == other.max_pieces and self.min_pieces == other.min_pieces and \
+            self.min_to_move() == other.min_to_move()
+
+    # Hash the game and return its hash code
+    def __hash__(self):
+        return self.key
+
+    # Return the Zobrist key of the game's canonical form, which is the same for every game symmetric to it, and the
+    # symmetry mapping the game onto its canonical form
+    def canonical_key(self):
+        max_bits, min_bits, symmetry = self.geometry.canonical(self.max_bits, self.min_bits)
+        return self.geometry.key(max_bits, min_bits, self.max_pieces, self.min_pieces, self.min_to_move()), symmetry
+
+    # Return the utility of this game if it is over : Max winning is 1, Min winning is -1, Draw is 0
+    # Otherwise, return None
+    def utility(self):
+        # We are at the beginning of the game
+        if self.last_player is None:
+            return None
+
+        # The game is over if one of the players only has less than three pieces left on the board
+        if (not self.last_player.maximizes()) and self.max_pieces == 0 and self.max_bits.bit_count() < 3:
+            return -1
+
+        if self.last_player.maximizes() and self.min_pieces == 0 and self.min_bits.bit_count() < 3:
+            return 1
+
+        # The game is also over if one of the players have no more moves to make
+        if not self.has_legal_move():
+            if self.last_player.maximizes():
+                return 1
+
+            else:
+                return -1
+
+    # Helper functions to check how close a mill would be for a player
+    # Locations may be given as a set of (square, position in square) tuples or as a bit mask.
+    # The counts for a player's own pieces are read from the running totals
+    # Check for already existing mills
+    def has_mill(self, locations):
+        bits = to_bits(locations)
+
+        if bits == self.max_bits:
+            return self.line_total & 0xFF
+
+        if bits == self.min_bits:
+            return (self.line_total >> MIN_SHIFT) & 0xFF
+
+        mill_count = 0
+
+        for line in self.geometry.mills:
+            if line & bits == line:
+                mill_count += 1
+
+        return mill_count
+
+    # Check how many pairs only require a piece to become a mill
+    # If in phase 2 of the game, we check if a move is available to complete the potential mill
+    def one_to_mill(self, locations, phase):
+        bits = to_bits(locations)
+
+        # Pairs that another piece could move to complete are counted 16 bits above the open pairs
+        if bits == self.max_bits or bits == self.min_bits:
+            shift = (8 if phase != 2 else 16) + (MIN_SHIFT if bits != self.max_bits else 0)
+            return (self.line_total >> shift) & 0xFF
+
+        empty = self.empty_bits()
+        mill_count = 0
+
+        for pair, space, reach in self.geometry.mill_pairs:
+            # A pair of pieces with the rest of its line empty, and in phase 2 another piece next to the empty point
+            if pair & bits == pair and space & empty and (phase != 2 or reach & bits):
+                mill_count += 1
+
+        return mill_count
+
+    # Return the bit mask of the empty points that would complete a mill for the pieces of a bit mask
+    def mill_spaces(self, bits):
+        empty = self.empty_bits()
+        spaces = 0
+
+        # The lines with a player's open pairs are marked in their tallies
+        if bits == self.max_bits or bits == self.min_bits:
+            pair = 0x100 << (MIN_SHIFT if bits != self.max_bits else 0)
+
+            for line, tally in zip(self.geometry.mills, self.tallies):
+                if tally & pair:
+                    spaces |= line & empty
+
+            return spaces
+
+        for pair, space, reach in self.geometry.mill_pairs:
+            if pair & bits == pair and space & empty:
+                spaces |= space
+
+        return spaces
+
+    # Check how many pieces are blocked from moving anywhere on the board
+    def blocked_pieces(self, locations):
+        bits = to_bits(locations)
+        neighbours = self.geometry.neighbours
+
+        # Track the number of blocked pieces found
+        blocked = 0
+
+        # A piece is blocked when all of its adjacent locations hold pieces of the same player
+        for i in indices(bits):
+            if not neighbours[i] & ~bits:
+                blocked += 1
+
+        return blocked
+
+    # Weights of the features in the estimate of the game's utility
+    weights = None
+
+    # Extract the features of the game for a player, in the order of the weights
+    def features(self, player):
+        raise NotImplementedError
+
+    # Estimate the utility of the game if needed:
+    # The estimate is the weighted sum of the game's features averaged over 10, using the game's weights unless
+    # others are given
+    def evaluate(self, player, weights=None):
+        return sum(map(mul, weights or self.weights, self.features(player))) / 10
+
+    # Determine a player's options when they can only move to adjacent locations
+    def phase2_moves(self, locations):
+        neighbours = self.geometry.neighbours
+        empty = self.empty_bits()
+        moves = list()
+
+        # Check each location of the ones given for adjacent slots in the available spaces
+        for i in indices(to_bits(locations)):
+            row = self.geometry.moves[i]
+
+            # Add a four tuple to allow switching positions
+            for j in indices(neighbours[i] & empty):
+                moves.append(row[j])
+
+        return moves
+
+    # Determine a player's options when they can move their three pieces anywhere on the board
+    def phase3_moves(self, locations):
+        spaces = indices(self.empty_bits())
+        moves = list()
+
+        # Add the options available for each of the given locations
+        for i in indices(to_bits(locations)):
+            row = self.geometry.moves[i]
+
+            # Add a four tuple to allow switching positions to a new location
+            moves.extend([row[j] for j in spaces])
+
+        return moves
+
+    # Return a list of possible moves for the game:
+    # Moves closing a mill are listed once for each of the opponent's pieces they may take, with the moves taking the
+    # most threatening piece among the other moves and the rest after them. Callers must not modify the list
+    def moves(self):
+        moves = self.first_moves()
+        later = self.later_captures(moves)
+        return moves + later if later else moves
+
+    # Return the moves to search first: every possible move, with the moves closing a mill taking only the most
+    # threatening of the pieces they may take. The list is kept until the game changes, so callers must not modify it
+    def first_moves(self):
+        if self.move_list is None:
+            self.move_list = self.generate_moves()
+
+        return self.move_list
+
+    # Return the moves taking the other pieces that the moves closing a mill in a list of first moves may take, in
+    # order of threat and optionally only up to a number of pieces for each move, counting the first
+    def later_captures(self, moves, targets=None):
+        placing = self.placing()
+        at = 2 if placing else 4
+        points = self.geometry.points
+        captures = list()
+
+        for move in moves:
+            if len(move) > at:
+                own, other, to, bits = self.landing(move, placing)
+                base = move[:at]
+                captures.extend([base + points[i] for i in self.capture_targets(bits, other)[1:targets]])
+
+        return captures
+
+    # Return whether the player to move has any possible move, stopping at the first one found instead of listing
+    # them all
+    def has_legal_move(self):
+        if self.move_list is not None:
+            return len(self.move_list) > 0
+
+        empty = self.empty_bits()
+
+        # Pieces can be placed on any empty point
+        if self.placing():
+            return empty != 0
+
+        bits = self.min_bits if self.min_to_move() else self.max_bits
+        count = bits.bit_count()
+
+        # Three pieces that can fly can move to any empty point
+        if count == 3 and self.geometry.flying:
+            return empty != 0
+
+        # Otherwise one of the pieces needs an empty neighbour
+        if count >= 3:
+            neighbours = self.geometry.neighbours
+            for i in indices(bits):
+                if neighbours[i] & empty:
+                    return True
+
+        return False
+
+    # Generate the list of possible moves for the game
+    def generate_moves(self):
+        # If the players still have pieces not on the board, they may place them anywhere on the board where
+        # there is empty space
+        if self.placing():
+            points = self.geometry.points
+            possible_moves = [points[i] for i in indices(self.empty_bits())]
+            return self.add_captures(possible_moves, True)
+
+        # If the players have all their pieces on the board, the player to move is found from the last player
+        if self.min_to_move():
+            bits = self.min_bits
+
+        else:
+            bits = self.max_bits
+
+        count = bits.bit_count()
+
+        # If the players have only 3 pieces left, they may place them anywhere on the board where there is empty space
+        # in variants that allow flying
+        if count == 3 and self.geometry.flying:
+            return self.add_captures(self.phase3_moves(bits), False)
+
+        # Otherwise they can only move their pieces to adjacent positions
+        if count >= 3:
+            return self.add_captures(self.phase2_moves(bits), False)
+
+        # If the players only have two pieces on the board, they cannot move anywhere
+        return list()
+
+    # Return the moves of the player to move with the location of the most threatening of the opponent's pieces that
+    # may be taken added to the moves that close a mill. The moves taking the other pieces are left to later_captures()
+    def add_captures(self, moves, placing):
+        if self.min_to_move():
+            own, other = self.min_bits, self.max_bits
+        else:
+            own, other = self.max_bits, self.min_bits
+
+        # Only the moves onto a point completing one of the player's open pairs can close a mill
+        spaces = self.mill_spaces(own) if other else 0
+        if not spaces:
+            return moves
+
+        points = self.geometry.points
+        captures = list()
+
+        for move in moves:
+            own, other, to, bits = self.landing(move, placing)
+
+            if (1 << to) & spaces and self.forms_mill(bits, 1 << to):
+                captures.append(move + points[self.capture_targets(bits, other)[0]])
+            else:
+                captures.append(move)
+
+        return captures
+
+    # Return the bit masks of the pieces of the player to move and of the opponent, the point a move of the player to
+    # move puts a piece on, and the bit mask of the player's pieces after the move
+    def landing(self, move, placing):
+        if self.min_to_move():
+            own, other = self.min_bits, self.max_bits
+        else:
+            own, other = self.max_bits, self.min_bits
+
+        if placing:
+            to = move[0] * 8 + move[1]
+            return own, other, to, own | (1 << to)
+
+        to = move[2] * 8 + move[3]
+        return own, other, to, own ^ (1 << (move[0] * 8 + move[1])) ^ (1 << to)
+
+    # Return the points of the pieces that may be taken off the board when a player closes a mill, given the bit masks
+    # of the player's pieces and of the opponent's:
+    # Pieces in the opponent's mills may only be taken when every piece is in one. The points are ordered by the threat
+    # of their pieces, the pieces in more of the opponent's open pairs first
+    def capture_targets(self, own, other):
+        geometry = self.geometry
+        protected = 0
+
+        for line in geometry.mills:
+            if line & other == line:
+                protected |= line
+
+        targets = (other & ~protected) or other
+        empty = geometry.full & ~(own | other)
+        threats = dict.fromkeys(indices(targets), 0)
+
+        for pair, space, reach in geometry.mill_pairs:
+            if pair & other == pair and space & empty:
+                for i in indices(pair & targets):
+                    threats[i] += 1
+
+        return sorted(threats, key=lambda i: -threats[i])
+
+    # Return the points of a move of the player to move: the point its piece moves from (None when placing one), the
+    # point the piece moves to and the point of the piece it takes (None if it does not name one)
+    def move_points(self, move):
+        # The capture follows the placement of a piece or the two points of a moved one
+        at = 2 if self.placing() else 4
+        taken = move[at] * 8 + move[at + 1] if len(move) > at else None
+
+        if at == 2:
+            return None, move[0] * 8 + move[1], taken
+
+        return move[0] * 8 + move[1], move[2] * 8 + move[3], taken
+
+    # Helper functions to check for 3-in-a-row as a result of a move (known as mills)
+    def isMill(self, locations, move):
+        # Get the location of the added piece
+        to = self.move_points(move)[1]
+
+        # Sets of locations are checked against the mill lines through the piece as sets of locations
+        if not isinstance(locations, int):
+            for line in self.geometry.point_mill_sets[to]:
+                if line <= locations:
+                    return True
+
+            return False
+
+        return self.forms_mill(locations, 1 << to)
+
+    # Check whether the piece on a point (given as a single bit) completes a mill in a bit mask of locations
+    def forms_mill(self, bits, point):
+        for line in self.geometry.point_mills[point.bit_length() - 1]:
+            if line & bits == line:
+                return True
+
+        return False
+
+    # Return the bit of the piece taken off the board by a move of the player to move closing a mill, given the bit
+    # masks of the player's pieces after the move and of the opponent's: the piece the move names, or else the first
+    # piece that may be taken
+    def capture(self, move, own, other):
+        taken = self.move_points(move)[2]
+
+        if taken is None:
+            taken = self.capture_targets(own, other)[0]
+
+        elif not other & (1 << taken):
+            raise ValueError("The move takes no piece of the opponent's: " + str(move))
+
+        return 1 << taken
+
+    def mills(self, game, move):
+        # We are checking if the player has a mill or not, then returning a board possibly modified as a result
+        player = game.last_player
+        max_bits = game.max_bits
+        min_bits = game.min_bits
+
+        if player.maximizes() and min_bits and self.isMill(max_bits, move):
+            # Take the min's piece named by the move off the board
+            min_bits ^= self.capture(move, max_bits, min_bits)
+
+        elif (not player.maximizes()) and max_bits and self.isMill(min_bits, move):
+            # Take the max's piece named by the move off the board
+            max_bits ^= self.capture(move, min_bits, max_bits)
+
+        return self.from_bits(player, game.max_pieces, game.min_pieces, max_bits, min_bits)
+
+    # Return a copy of this game
+    def copy(self):
+        return self.from_bits(self.last_player, self.max_pieces, self.min_pieces, self.max_bits, self.min_bits, self.key,
+                              (self.tallies, self.line_total, self.blocked_total), self.move_list)
+
+    # Return this game's child created by a move of a given player
+    def child(self, move, player):
+        game = self.copy()
+        game.make_move(move, player)
+        return game
+
+    # Make a move of a player on this game in place, by default for the player to move.
+    # Return the undo record (last player, bitboards, pieces to place, key, tallies and list of moves before the move,
+    # and the bit of the piece taken off the board as a result of the move or 0) for unmaking the move
+    def make_move(self, move, player=None):
+        if player is None:
+            player = MIN_SIDE if self.min_to_move() else MAX_SIDE
+
+        geometry = self.geometry
+        maximizes = player.maximizes()
+
+        # The bitboards, the number of pieces and the key for both max and min before the move
+        max_bits, min_bits = self.max_bits, self.min_bits
+        max_pieces, min_pieces = self.max_pieces, self.min_pieces
+        key = self.key
+        undo = (self.last_player, max_bits, min_bits, max_pieces, min_pieces, key,
+                self.tallies, self.line_total, self.blocked_total, self.move_list)
+        taken = 0
+
+        # The player to move changes in the key
+        if maximizes != self.min_to_move():
+            key ^= geometry.min_to_move_key
+
+        # Unpack move based on the pieces the player has left to place (moves of pieces already on the board to a new
+        # location start with their old location), with the location of the piece it takes at the end
+        if (max_pieces if maximizes else min_pieces) > 0:
+            # We are only moving a piece onto the board
+            to = move[0] * 8 + move[1]
+            at = 2
+            moved = 1 << to
+
+            if maximizes:
+                key ^= geometry.max_hand_keys[max_pieces] ^ geometry.max_hand_keys[max_pieces - 1]
+                max_pieces -= 1
+
+            else:
+                key ^= geometry.min_hand_keys[min_pieces] ^ geometry.min_hand_keys[min_pieces - 1]
+                min_pieces -= 1
+
+        else:
+            # We are moving a piece already on the board to a new position
+            start, to = move[0] * 8 + move[1], move[2] * 8 + move[3]
+            moved = (1 << start) | (1 << to)
+            at = 4
+            key ^= (geometry.max_keys if maximizes else geometry.min_keys)[start]
+
+        if maximizes:
+            max_bits ^= moved
+            key ^= geometry.max_keys[to]
+
+            # Check for mills as a result of the move and take the piece of min's it names off the board
+            if min_bits and self.forms_mill(max_bits, 1 << to):
+                taken = 1 << (move[at] * 8 + move[at + 1]) if len(move) > at else \
+                    1 << self.capture_targets(max_bits, min_bits)[0]
+
+                if not taken & min_bits:
+                    raise ValueError("The move takes no piece of min's: " + str(move))
+
+                min_bits ^= taken
+                key ^= geometry.min_keys[taken.bit_length() - 1]
+
+        else:
+            min_bits ^= moved
+            key ^= geometry.min_keys[to]
+
+            # Check for mills as a result of the move and take the piece of max's it names off the board
+            if max_bits and self.forms_mill(min_bits, 1 << to):
+                taken = 1 << (move[at] * 8 + move[at + 1]) if len(move) > at else \
+                    1 << self.capture_targets(min_bits, max_bits)[0]
+
+                if not taken & max_bits:
+                    raise ValueError("The move takes no piece of max's: " + str(move))
+
+                max_bits ^= taken
+                key ^= geometry.max_keys[taken.bit_length() - 1]
+
+        # Only the lines and pieces near the changed points need their tallies updated
+        lines, near = geometry.touched((max_bits ^ undo[1]) | (min_bits ^ undo[2]))
+        tallies = self.tallies[:]
+        line_total = self.line_total
+
+        for k in lines:
+            tally = line_tally(geometry, k, max_bits, min_bits)
+            line_total += tally - tallies[k]
+            tallies[k] = tally
+
+        self.blocked_total += blocked_tally(geometry, near, max_bits, min_bits) - \
+            blocked_tally(geometry, near, undo[1], undo[2])
+
+        self.last_player = player
+        self.max_bits, self.min_bits = max_bits, min_bits
+        self.max_pieces, self.min_pieces = max_pieces, min_pieces
+        self.key = key
+        self.tallies, self.line_total = tallies, line_total
+        self.move_list = None
+        return undo + (taken,)
+
+    # Restore this game to before the move of an undo record
+    def unmake_move(self, undo):
+        self.last_player, self.max_bits, self.min_bits, self.max_pieces, self.min_pieces, self.key, \
+            self.tallies, self.line_total, self.blocked_total, self.move_list, taken = undo
+
+
+# Stand-ins for the players, for moves made on a game without player objects
+class Side(Player):
+    def __init__(self, maximizes):
+        self.max = maximizes
+
+    def maximizes(self):
+        return self.max
+
+
+MAX_SIDE = Side(True)
+MIN_SIDE = Side(False)
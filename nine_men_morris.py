@@ -3,472 +3,75 @@
 # Citations: Nine Men's Morris Game Description: https://en.wikipedia.org/wiki/Nine_men%27s_morris
 #            Python pass-by-reference or pass-by-value: https://jeffknupp.com/blog/2012/11/13/is-python-callbyvalue-or-callbyreference-neither/
 
-from framework import Game
-from copy import deepcopy
+from morris import Morris
+from geometry import NINE
 
 # Unplayed board configuration
 INITIAL_BOARD = [[' ' for x in range(8)] for y in range(3)]
 
 
-class NineMensMorris(Game):
+class NineMensMorris(Morris):
+    # Tables of the Nine Men's Morris board
+    geometry = NINE
+
     # Create a game object:
     # The board starts empty with no players yet and each player having 9 pieces to use with 0 on the board
     def __init__(self, board=INITIAL_BOARD, last_player=None, max_pieces=9, min_pieces=9, max_loc=set(), min_loc=set()):
-        self.board = board
-        self.last_player = last_player
-        self.max_pieces = max_pieces
-        self.min_pieces = min_pieces
-
-        # Track the locations of player pieces and spaces available on the board
-        self.max_loc = max_loc
-        self.min_loc = min_loc
-        self.spaces = {(x, y) for x in range(3) for y in range(8)} - self.max_loc - self.min_loc
-
-    # Check for game equivalence with another:
-    # This means the same number of pieces for each player and the same board configuration
-    def __eq__(self, other):
-        return self.board == other.board and self.max_pieces == other.max_pieces and self.min_pieces == other.min_pieces
-
-    # Hash the game and return its hash code
-    def __hash__(self):
-        return hash(str(self.board) + str(self.max_pieces) + str(self.min_pieces))
-
-    # Return the utility of this game if it is over : Max winning is 1, Min winning is -1, Draw is 0
-    # Otherwise, return None
-    def utility(self):
-        # We are at the beginning of the game
-        if self.last_player is None:
-            return None
-
-        # The game is over if one of the players only has less than three pieces left on the board
-        if (not self.last_player.maximizes()) and self.max_pieces == 0 and len(self.max_loc) < 3:
-            return -1
-
-        if self.last_player.maximizes() and self.min_pieces == 0 and len(self.min_loc) < 3:
-            return 1
-
-        # The game is also over if one of the players have no more moves to make
-        if not self.moves():
-            if self.last_player.maximizes():
-                return 1
-
-            else:
-                return -1
-
-    # Helper functions to check how close a mill would be for a player
-    # Check for already existing mills
-    def has_mill(self, locations):
-        mill_count = 0
-
-        # Keep track of mills that have already been determined
-        counted = set()
-
-        for loc in locations:
-            x, y = loc
-
-            # The piece is located at the middle of a line on the board
-            if y % 2 == 1:
-                # Check if the necessary adjacent pieces are also available
-                potential_mill = {(x, (y - 1) % 8), (x, y), (x, (y + 1) % 8)}
-                potential_vertical_mill = {((x - 1) % 3, y), (x, y), ((x + 1) % 3, y)}
-
-                if potential_mill.issubset(locations) and not \
-                        potential_mill.issubset(counted):
-                    # Add the mill to our set of counted mills
-                    counted |= potential_mill
-                    mill_count += 1
-
-                if potential_vertical_mill.issubset(locations) and not \
-                        potential_vertical_mill.issubset(counted):
-                    # Add the mill to our set of counted mills
-                    counted |= potential_vertical_mill
-                    mill_count += 1
-
-            # The piece is located at the corner of a square on the grid
-            else:
-                # Check if the necessary adjacent pieces are also available
-                potential_mill1 = {(x, (y - 1) % 8), (x, (y - 2) % 8), (x, y)}
-                potential_mill2 = {(x, y), (x, (y + 1) % 8), (x, (y + 2) % 8)}
-
-                # Before the piece location
-                if potential_mill1.issubset(locations) and not potential_mill1.issubset(counted):
-                    # Add the mill to our set of counted mills
-                    counted |= potential_mill1
-                    mill_count += 1
-
-                # After the piece location
-                if potential_mill2.issubset(locations) and not potential_mill2.issubset(counted):
-                    # Add the mill to our set of counted mills
-                    counted |= potential_mill2
-                    mill_count += 1
-
-        return mill_count
-
-    # Check how many pairs only require a piece to become a mill
-    # If in phase 2 of the game, we check if a move is available to complete the potential mill
-    def one_to_mill(self, locations, phase):
-        mill_count = 0
-
-        # Keep track of potential mills that have already been determined
-        counted = set()
+        super().__init__(board, last_player, max_pieces, min_pieces, max_loc, min_loc)
 
-        for loc in locations:
-            x, y = loc
+    # Weights of the features in the estimate of the game's utility, in the order in which they are extracted
+    weights = (1, 1, 2, 1, 5, 2, 1)
 
-            # The piece is located at the middle of a line on the board
-            if y % 2 == 1:
-                # Check for an adjacent left piece and a right space
-                if (x, (y - 1) % 8) in locations and (x, (y + 1) % 8) in self.spaces and not \
-                        {(x, (y - 1) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and (x, (y + 2) % 8) in locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y - 1) % 8), (x, y)}
-                        mill_count += 1
+    # Extract the features of the game for a player in a single pass:
+    # The advantages in pieces off and on the board, the player's mills and likely mills, and the advantages in
+    # mills, possible mills and blocked opponent pieces
+    def features(self, player):
+        max_count, min_count = self.max_bits.bit_count(), self.min_bits.bit_count()
 
-                # Check for an adjacent right piece and a left space
-                if (x, (y + 1) % 8) in locations and (x, (y - 1) % 8) in self.spaces and not \
-                        {(x, (y + 1) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and (x, (y - 2) % 8) in locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y + 1) % 8), (x, y)}
-                        mill_count += 1
+        # Running totals of mills, open pairs (phases 1 and 3), open pairs that can be completed by a move (phase 2)
+        # and blocked pieces
+        max_mills, min_mills, max_pairs, min_pairs, max_reach, min_reach, max_blocked, min_blocked = self.totals()
 
-                # Check for an adjacent top piece and a bottom space
-                if ((x - 1) % 3, y) in locations and ((x + 1) % 3, y) in self.spaces and not \
-                        {((x - 1) % 3, y), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and
-                                      {((x + 1) % 3, (y - 1) % 8), ((x + 1) % 3, (y + 1) % 8)} & locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {((x - 1) % 3, y), (x, y)}
-                        mill_count += 1
-
-                # Check for an adjacent bottom piece and a top space
-                if ((x + 1) % 3, y) in locations and ((x - 1) % 3, y) in self.spaces and not \
-                        {((x + 1) % 3, y), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and
-                                      {((x - 1) % 3, (y - 1) % 8), ((x - 1) % 3, (y + 1) % 8)} & locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {((x + 1) % 3, y), (x, y)}
-                        mill_count += 1
-
-            # The piece is located at the corner of a square on the grid
-            else:
-                # Check for an adjacent left piece and a further left space
-                if (x, (y - 1) % 8) in locations and (x, (y - 2) % 8) in self.spaces and not \
-                        {(x, (y - 1) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and (x, (y - 3) % 8) in locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y - 1) % 8), (x, y)}
-                        mill_count += 1
-
-                # Check for an adjacent right piece and a further right space
-                if (x, (y + 1) % 8) in locations and (x, (y + 2) % 8) in self.spaces and not \
-                        {(x, (y + 1) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and (x, (y + 3) % 8) in locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y + 1) % 8), (x, y)}
-                        mill_count += 1
-
-                # Check for a corner piece on the same line with a center space
-                if (x, (y - 2) % 8) in locations and (x, (y - 1) % 8) in self.spaces and not \
-                        {(x, (y - 2) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and
-                                      {((x - 1) % 3, (y - 1) % 8), ((x + 1) % 3, (y - 1) % 8)} & locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y - 2) % 8), (x, y)}
-                        mill_count += 1
-
-                if (x, (y + 2) % 8) in locations and (x, (y + 1) % 8) in self.spaces and not \
-                        {(x, (y + 2) % 8), (x, y)}.issubset(counted):
-                    if phase != 2 or (phase == 2 and
-                                      {((x - 1) % 3, (y + 1) % 8), ((x + 1) % 3, (y + 1) % 8)} & locations):
-                        # Add the accounted for pair to the set of counted mill potentials
-                        counted |= {(x, (y + 2) % 8), (x, y)}
-                        mill_count += 1
-
-        return mill_count
-
-    # Check how many pieces are blocked from moving anywhere on the board
-    def blocked_pieces(self, locations):
-        # Track the number of blocked pieces found
-        blocked = 0
-
-        for loc in locations:
-            x, y = loc
-
-            # The piece is located at the middle of a line on the board
-            if y % 2 == 1 and x == 0 and {((x + 1) % 3, y), (x, (y - 1) % 8), (x, (y + 1) % 8)}.issubset(locations):
-                blocked += 1
-
-            if y % 2 == 1 and x == 1 and \
-                    {((x + 1) % 3, y), ((x - 1) % 3, y), (x, (y - 1) % 8), (x, (y + 1) % 8)}.issubset(locations):
-                blocked += 1
-
-            if y % 2 == 1 and x == 2 and {((x - 1) % 3, y), (x, (y - 1) % 8), (x, (y + 1) % 8)}.issubset(locations):
-                blocked += 1
-
-            # The piece is located at the corner of a square on the board
-            if y % 2 == 0 and {(x, (y - 1) % 8), (x, (y + 1) % 8)}.issubset(locations):
-                blocked += 1
-
-
-        return blocked
-
-    # Estimate the utility of the game if needed
-    def evaluate(self, player):
         # Consider the number of pieces each player has off the board for an estimated value in phase 1
-        off_board_advantage = (self.max_pieces - self.min_pieces) / (self.max_pieces + self.min_pieces) if\
-            (self.max_pieces + self.min_pieces) else 0
+        off_board = self.max_pieces + self.min_pieces
+        off_board_advantage = (self.max_pieces - self.min_pieces) / off_board if off_board else 0
 
         # Consider the number of pieces each player has on the board for an estimated value otherwise
-        on_board_advantage = (len(self.max_loc) - len(self.min_loc)) / (len(self.max_loc) + len(self.min_loc)) if \
-            (len(self.max_loc) + len(self.min_loc)) else 0
+        on_board = max_count + min_count
+        on_board_advantage = (max_count - min_count) / on_board if on_board else 0
 
         # Consider the number of mills each player already has available
-        mill_advantage = (self.has_mill(self.max_loc) - self.has_mill(self.min_loc)) / \
-                         (self.has_mill(self.max_loc) + self.has_mill(self.min_loc)) if \
-            (self.has_mill(self.max_loc) + self.has_mill(self.min_loc)) else 0
+        mills = max_mills + min_mills
+        mill_advantage = (max_mills - min_mills) / mills if mills else 0
 
         # Consider the number of blocked opponent pieces each player has
-        blocked_opponent_advantage = (self.blocked_pieces(self.min_loc) - self.blocked_pieces(self.max_loc)) / \
-                                     (self.blocked_pieces(self.min_loc) + self.blocked_pieces(self.max_loc)) if \
-        (self.blocked_pieces(self.min_loc) + self.blocked_pieces(self.max_loc)) else 0
+        blocked = min_blocked + max_blocked
+        blocked_opponent_advantage = (min_blocked - max_blocked) / blocked if blocked else 0
 
-        # Consider the number of possible mills each player has depending on the game phase
-        possible_mill_advantage = 0
-        # We are in phase 1
+        # Consider the number of possible mills each player has depending on the game phase:
+        # Past phase 1, a player in phase 3 can complete an open pair from anywhere, otherwise only by moving a piece
+        # next to it
         if self.max_pieces > 0:
-            possible_mill_advantage = (self.one_to_mill(self.max_loc, 1) - self.one_to_mill(self.min_loc, 1)) / \
-                                       (self.one_to_mill(self.max_loc, 1) + self.one_to_mill(self.min_loc, 1)) if \
-                (self.one_to_mill(self.max_loc, 1) + self.one_to_mill(self.min_loc, 1)) else 0
+            max_possible, min_possible = max_pairs, min_pairs
 
-        # We are past phase 1
         else:
-            # Max player is in phase 3
-            if len(self.max_loc) == 3:
-                possible_mill_advantage = (self.one_to_mill(self.max_loc, 3) - self.one_to_mill(self.min_loc, 2)) / \
-                             (self.one_to_mill(self.max_loc, 3) + self.one_to_mill(self.min_loc, 2)) if \
-                    (self.one_to_mill(self.max_loc, 3) + self.one_to_mill(self.min_loc, 2)) else 0
-
-            # Min player is in phase 3
-            elif len(self.min_loc) == 3:
-                possible_mill_advantage = (self.one_to_mill(self.max_loc, 2) - self.one_to_mill(self.min_loc, 3)) / \
-                             (self.one_to_mill(self.max_loc, 2) + self.one_to_mill(self.min_loc, 3)) if \
-                    (self.one_to_mill(self.max_loc, 2) + self.one_to_mill(self.min_loc, 3)) else 0
+            max_possible = max_pairs if max_count == 3 else max_reach
+            min_possible = min_pairs if min_count == 3 else min_reach
 
-            # Both players are in phase 3
-            elif len(self.max_loc) == 3 and len(self.min_loc) == 3:
-                possible_mill_advantage = (self.one_to_mill(self.max_loc, 3) - self.one_to_mill(self.min_loc, 3)) / \
-                             (self.one_to_mill(self.max_loc, 3) + self.one_to_mill(self.min_loc, 3)) if \
-                    (self.one_to_mill(self.max_loc, 3) + self.one_to_mill(self.min_loc, 3)) else 0
-            else:
-                possible_mill_advantage = (self.one_to_mill(self.max_loc, 2) - self.one_to_mill(self.min_loc, 2)) / \
-                             (self.one_to_mill(self.max_loc, 2) + self.one_to_mill(self.min_loc, 2)) if \
-                    (self.one_to_mill(self.max_loc, 2) + self.one_to_mill(self.min_loc, 2)) else 0
+        possible = max_possible + min_possible
+        possible_mill_advantage = (max_possible - min_possible) / possible if possible else 0
 
         # Consider the mills and likely mills available to a player
-        mills = 0
-        likely_mills = 0
-
         if player.maximizes():
-            mills = self.has_mill(self.max_loc)
-
-            if self.max_pieces > 0:
-                likely_mills = self.one_to_mill(self. max_loc, 1)
-
-            else:
-                if len(self.max_loc) == 3:
-                    likely_mills = self.one_to_mill(self.max_loc, 3)
-                else:
-                    likely_mills = self.one_to_mill(self.max_loc, 2)
-        else:
-            mills = self.has_mill(self.min_loc)
-
-            if self.min_pieces > 0:
-                likely_mills = self.one_to_mill(self.min_loc, 1)
+            mills = max_mills
+            likely_mills = max_pairs if self.max_pieces > 0 or max_count == 3 else max_reach
 
-            else:
-                if len(self.min_loc) == 3:
-                    likely_mills = self.one_to_mill(self.min_loc, 3)
-                else:
-                    likely_mills = self.one_to_mill(self.min_loc, 2)
-
-        # return an estimate that uses a weighted sum and average value
-        return (off_board_advantage + on_board_advantage + (mills * 2) + likely_mills + (mill_advantage * 5) + (possible_mill_advantage * 2)
-                + (blocked_opponent_advantage)) / 10
-
-    # Determine a player's options when they can only move to adjacent locations
-    def phase2_moves(self, locations):
-        moves = list()
-
-        # Check each location of the ones given for adjacent slots in the available spaces
-        for loc in locations:
-            sq, in_sq = loc
-            # Pieces can move to their left or right
-            potential_spaces = {(sq, (in_sq - 1) % 8), (sq, (in_sq + 1) % 8)}
-
-            # The piece is at a square side's midpoint and can also move up or down
-            if in_sq % 2 == 1:
-                if sq == 0:
-                    potential_spaces.add(((sq + 1) % 3, in_sq))
-
-                if sq == 1:
-                    potential_spaces |= {((sq - 1) % 3, in_sq), ((sq + 1) % 3, in_sq)}
-
-                if sq == 2:
-                    potential_spaces.add(((sq - 1) % 3, in_sq))
-
-            # Of the potential spaces, find those actually available
-            available_spaces = self.spaces & potential_spaces
-
-            # Add the available spaces to our list of moves
-            for new_pos in available_spaces:
-                new_sq, new_in_sq = new_pos
-
-                # Add a four tuple to allow switching positions
-                moves.append((sq, in_sq, new_sq, new_in_sq))
-
-        return moves
-
-    # Determine a player's options when they can move their three pieces anywhere on the board
-    def phase3_moves(self, locations):
-        moves = list()
-
-        # Add the options available for each of the given locations
-        for loc in locations:
-            sq, in_sq = loc
-
-            for space in self.spaces:
-                new_sq, new_in_sq = space
-
-                # Add a four tuple to allow switching positions to a new location
-                moves.append((sq, in_sq, new_sq, new_in_sq))
-        return moves
-
-    # Return a list of possible moves for the game
-    def moves(self):
-        # If the players still have pieces not on the board, they may place them anywhere on the board where
-        # there is empty space
-        if (self.min_pieces > 0 and self.max_pieces > 0) or \
-                (self.last_player.maximizes() and self.min_pieces > 0) or \
-                ((not self.last_player.maximizes()) and self.max_pieces > 0):
-            possible_moves = [a for a in self.spaces]
-            return possible_moves
-
-        # If the players have all their pieces on the board:
-        # If the players have more than 3 pieces on the board, they can only move their pieces to adjacent positions
-        if self.last_player.maximizes() and (self.min_pieces == 0 and len(self.min_loc) > 3):
-            return self.phase2_moves(self.min_loc)
-
-        if not self.last_player.maximizes() and (self.max_pieces == 0 and len(self.max_loc) > 3):
-            return self.phase2_moves(self.max_loc)
-
-        # If the players have only 3 pieces left, they may place them anywhere on the board where there is empty space
-        if not self.last_player.maximizes() and (self.max_pieces == 0 and len(self.max_loc) == 3):
-            return self.phase3_moves(self.max_loc)
-
-        if self.last_player.maximizes() and (self.min_pieces == 0 and len(self.min_loc) == 3):
-            return self.phase3_moves(self.min_loc)
-
-        # If the players only have two pieces on the board, they cannot move anywhere
-        if (self.last_player.maximizes() and len(self.min_loc) == 2) or \
-                ((not self.last_player.maximizes()) and len(self.max_loc) == 2):
-            return list()
-
-    # Helper functions to check for 3-in-a-row as a result of a move (known as mills)
-    def isMill(self, locations, move):
-        # Get the location of the added piece
-        if len(move) == 2:
-            sq, in_sq = move
         else:
-            x, y, sq, in_sq = move
-
-        # Define subsets of possible mills to check if they are in the set of locations given
-        left_mill = {(sq, (in_sq - 2) % 8), (sq, (in_sq - 1) % 8), (sq, in_sq)}
-        right_mill = {(sq, in_sq), (sq, (in_sq + 1) % 8), (sq, (in_sq + 2) % 8)}
-        center_mill = {(sq, in_sq - 1), (sq, in_sq), (sq, in_sq + 1)}
-        vertical_mill = {(0, in_sq), (1, in_sq), (2, in_sq)}
-
-        # The piece is at a square's corner
-        if in_sq % 2 == 0 and (left_mill.issubset(locations) or right_mill.issubset(locations)):
-            return True
-
-        # The piece is at a square side's midpoint
-        if in_sq % 2 == 1 and (center_mill.issubset(locations) or vertical_mill.issubset(locations)):
-            return True
-
-        return False
-
-    def mills(self, game, move):
-        # We are checking if the player has a mill or not, then returning a board possibly modified as a result
-        board = game.board
-        player = game.last_player
-        max_loc = game.max_loc
-        min_loc = game.min_loc
-
-        if player.maximizes() and self.isMill(max_loc, move):
-            # Take one of the min's pieces off the board
-            space_square, space_pos_in_square = min_loc.pop()
-            board[space_square][space_pos_in_square] = ' '
-
-
-        elif (not player.maximizes()) and self.isMill(min_loc, move):
-            # Take one of the max's pieces off the board
-            space_square, space_pos_in_square = max_loc.pop()
-            board[space_square][space_pos_in_square] = ' '
-
-        return NineMensMorris(board, player, game.max_pieces, game.min_pieces, max_loc, min_loc)
-
-    # Return this game's child created by a move of a given player
-    def child(self, move, player):
-        # Copy the board representation for modification
-        new_board = deepcopy(self.board)
-
-        # Copy the location sets for both max and min for modification
-        new_max_loc = self.max_loc.copy()
-        new_min_loc = self.min_loc.copy()
-
-        # Copy the number of pieces for both max and min for modification
-        new_max_pieces = self.max_pieces
-        new_min_pieces = self.min_pieces
-
-        # Unpack move based on its length (four tuples are for moving pieces already on the board to a new location)
-        if len(move) == 2:
-            # We are only moving a piece onto the board
-            square, pos_in_square = move
-
-            if player.maximizes():
-                new_board[square][pos_in_square] = 'A'
-                new_max_pieces -= 1
-                new_max_loc.add(move)
-
-            else:
-                new_board[square][pos_in_square] = 'I'
-                new_min_pieces -= 1
-                new_min_loc.add(move)
-
-        else:
-            # We are moving a piece already on the board to a new position
-            init_square, init_pos_in_square, new_square, new_pos_in_square = move
-
-            # Remove the piece from its original position
-            new_board[init_square][init_pos_in_square] = ' '
-
-            if player.maximizes():
-                new_board[new_square][new_pos_in_square] = 'A'
-                new_max_loc.remove((init_square, init_pos_in_square))
-                new_max_loc.add((new_square, new_pos_in_square))
-
-            else:
-                new_board[new_square][new_pos_in_square] = 'I'
-                new_min_loc.remove((init_square, init_pos_in_square))
-                new_min_loc.add((new_square, new_pos_in_square))
-
-        game = NineMensMorris(new_board, player, new_max_pieces, new_min_pieces, new_max_loc,
-                              new_min_loc)
+            mills = min_mills
+            likely_mills = min_pairs if self.min_pieces > 0 or min_count == 3 else min_reach
 
-        # Check for mills as a result of the move and modify the board accordingly
-        return self.mills(game, move)
+        return (off_board_advantage, on_board_advantage, mills, likely_mills, mill_advantage, possible_mill_advantage,
+                blocked_opponent_advantage)
 
     # Print the game in the console
     def display(self):
@@ -0,0 +1,23 @@
+# Solve the endgames of Nine Men's Morris with up to a number of pieces per side (3 by default), and optionally up to a
+# number of pieces in all, and write them to a database file for the alpha-beta players to probe:
+# python nine_mens_endgames.py [pieces] [file] [total]
+#
+# With NumPy the tables are solved in passes over arrays of positions, keeping four bytes for each position of the pair
+# of tables being solved. Up to 4 against 4 takes about a minute, and up to 5 against 4 (5 pieces, 9 in all) about five
+# minutes and 1.7 GB. Without NumPy, positions are solved one at a time and 3 against 3 alone takes about ten minutes.
+# The file keeps the positions in their canonical form only, about a sixteenth of them: 34 MB up to 5 against 4
+
+import sys
+from endgame import EndgameSolver
+from nine_men_morris import NineMensMorris
+
+most = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+path = sys.argv[2] if len(sys.argv) > 2 else 'nine_mens_endgames.db'
+total = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+solver = EndgameSolver(NineMensMorris)
+solver.solve(most, total)
+solver.write(path)
+
+for own_hand, other_hand, own, other in sorted(solver.tables):
+    print(own, "against", other, ":", len(solver.tables[own_hand, other_hand, own, other]), "positions")
@@ -0,0 +1,110 @@
+# Purpose: Move ordering for the alpha-beta players, so that the moves most likely to be best are searched first
+# Citations: Move ordering: https://www.chessprogramming.org/Move_Ordering
+#            Killer heuristic: https://www.chessprogramming.org/Killer_Heuristic
+#            History heuristic: https://www.chessprogramming.org/History_Heuristic
+
+# Scores of the kinds of moves, searched from the highest: the best move of an earlier search of the game, moves that
+# close a mill, moves that block one of the opponent's mills or take one of the pieces that would close it, and moves
+# that pruned other games at the same depth.
+# The remaining moves are ordered by their history scores, which stay below the killer moves' scores
+STORED_SCORE = 1 << 24
+MILL_SCORE = 1 << 23
+BLOCK_SCORE = 1 << 22
+KILLER_SCORES = (1 << 21, 1 << 20)
+HISTORY_CAP = (1 << 20) - 1
+
+# Number of killer moves remembered for each depth
+KILLERS = 2
+
+
+class MoveOrdering(object):
+    # Create an ordering, optionally without killer moves or the history heuristic
+    def __init__(self, killers=True, history=True):
+        self.use_killers = killers
+        self.use_history = history
+
+        # Moves that pruned the search at each depth, and the history scores of moves that pruned it anywhere
+        self.killers = []
+        self.history = {}
+
+    # Start a new search for a move:
+    # Killer moves belong to the positions of the last search, while history scores are halved so that they
+    # favour recent searches
+    def new_search(self):
+        self.killers = []
+        self.history = {move: score >> 1 for move, score in self.history.items() if score > 1}
+
+    # Return the moves of a game in the order in which they should be searched at a depth
+    def order(self, game, moves, depth, stored_move=None):
+        if len(moves) < 2:
+            return moves
+
+        # Bit masks of the player to move, and of the empty points that would complete the opponent's mills
+        if game.min_to_move():
+            own, opponent = game.min_bits, game.max_bits
+        else:
+            own, opponent = game.max_bits, game.min_bits
+
+        threats = game.mill_spaces(opponent)
+        killers = self.killers[depth] if self.use_killers and depth < len(self.killers) else ()
+        history = self.history if self.use_history else {}
+
+        placing = game.placing()
+        at = 2 if placing else 4
+        # Pieces of the opponent's open pairs, found when a move taking a piece is first met
+        threatening = None
+        scores = {}
+        for move in moves:
+            # A moved piece leaves its old location, which cannot be part of the mill it closes
+            if placing:
+                to = 1 << (move[0] * 8 + move[1])
+                bits = own | to
+            else:
+                to = 1 << (move[2] * 8 + move[3])
+                bits = (own & ~(1 << (move[0] * 8 + move[1]))) | to
+
+            score = history.get(move, 0)
+
+            if move == stored_move:
+                score += STORED_SCORE
+
+            if game.forms_mill(bits, to):
+                score += MILL_SCORE
+
+            blocks = to & threats
+
+            # Taking a piece of an open pair blocks its mill too
+            if not blocks and threats and len(move) > at:
+                if threatening is None:
+                    threatening = 0
+                    for pair, space, reach in game.geometry.mill_pairs:
+                        if pair & opponent == pair and space & threats:
+                            threatening |= pair
+
+                blocks = threatening & (1 << (move[at] * 8 + move[at + 1]))
+
+            if blocks:
+                score += BLOCK_SCORE
+
+            if move in killers:
+                score += KILLER_SCORES[killers.index(move)]
+
+            scores[move] = score
+
+        return sorted(moves, key=scores.__getitem__, reverse=True)
+
+    # Remember a move that pruned the search at a depth, with the given depth left below it
+    def cutoff(self, move, depth, remaining):
+        if self.use_killers:
+            while len(self.killers) <= depth:
+                self.killers.append([])
+
+            killers = self.killers[depth]
+
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[KILLERS:]
+
+        # Moves pruning deeper searches earn more
+        if self.use_history:
+            self.history[move] = min(self.history.get(move, 0) + remaining * remaining, HISTORY_CAP)
@@ -0,0 +1,168 @@
+# Purpose: Parallel search of a game's root moves over a pool of worker processes sharing the best value found
+# Citations: Parallel search: https://www.chessprogramming.org/Parallel_Search
+#            Young Brothers Wait Concept: https://www.chessprogramming.org/Young_Brothers_Wait_Concept
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Value
+from deepening import SearchTimeout
+from transposition import EXACT
+from morris import MAX_SIDE, MIN_SIDE
+from copy import copy
+from math import inf
+
+# Search engine of a worker process, the number of the root search it is working on, and the best value found at the
+# root of that search so far, shared by every worker
+worker_engine = None
+worker_search = None
+shared_alpha = None
+
+
+# Set up a worker process with its own engine, configured like the engine it works for but searching on its own and
+# counting its nodes in the counter shared by every worker
+def start_worker(engine_class, config, alpha, nodes):
+    global worker_engine, shared_alpha
+    config = copy(config)
+    config.workers = 1
+    worker_engine = engine_class(config)
+    worker_engine.budget.counter = nodes
+    shared_alpha = alpha
+
+
+# Return what is needed to rebuild a game in another process: its class, whether the last player maximizes (or None
+# at the beginning of the game), the pieces to place and the bitboards
+def pack(game):
+    last_player = None if game.last_player is None else game.last_player.maximizes()
+    return type(game), last_player, game.max_pieces, game.min_pieces, game.max_bits, game.min_bits
+
+
+# Rebuild a packed game
+def unpack(state):
+    cls, last_player, max_pieces, min_pieces, max_bits, min_bits = state
+
+    if last_player is not None:
+        last_player = MAX_SIDE if last_player else MIN_SIDE
+
+    return cls.from_bits(last_player, max_pieces, min_pieces, max_bits, min_bits)
+
+
+# Search one root move of a packed game in a worker, within the budget of the root search:
+# The search stops at the root search's deadline, or once the nodes counted by the engine and every worker exceed its
+# node limit. The window starts from the best value found at the root so far, so the subtree is pruned as much as the
+# moves searched before it allow. Return the value of the move for the player at the root, or None if the budget ran
+# out, the best value it was searched against (the value is exact only if it is higher) and the nodes searched
+def search_move(state, move, limit, search, deadline, node_limit, armed):
+    global worker_search
+    engine = worker_engine
+
+    # Keep the worker's table and ordering from one root move to the next, but not from one root search to the next
+    if worker_search != search:
+        worker_search = search
+        engine.table.new_search()
+        engine.ordering.new_search()
+
+    budget = engine.budget
+    budget.start(None, node_limit)
+    budget.deadline = deadline
+    budget.armed = armed
+
+    game = unpack(state)
+    game.make_move(move)
+
+    alpha = shared_alpha.value
+
+    # Moves taken by the worker after the budget has run out are not searched at all
+    if armed and budget.share(0):
+        return None, alpha, 0
+
+    try:
+        value = -engine.negamax(game, -inf, -alpha, 1, limit)
+
+    except SearchTimeout:
+        return None, alpha, budget.nodes
+
+    # Nodes are shared 128 at a time while searching, and the rest once the move is searched
+    if budget.counter is not None:
+        budget.share(budget.nodes & 127)
+
+    if value > alpha:
+        with shared_alpha.get_lock():
+            if value > shared_alpha.value:
+                shared_alpha.value = value
+
+    return value, alpha, budget.nodes
+
+
+class ParallelRoot(object):
+    # Create a pool of worker processes searching root moves for an engine
+    def __init__(self, engine, workers):
+        self.alpha = Value('d', -inf)
+        self.nodes = Value('q', 0)
+        self.executor = ProcessPoolExecutor(workers, initializer=start_worker,
+                                            initargs=(type(engine), engine.config, self.alpha, self.nodes))
+        self.searches = 0
+
+    # Start a new search for a move
+    def new_search(self):
+        self.searches += 1
+
+    # Stop the worker processes
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    # Search the root of a game to a depth limit for an engine, and return the best move and its value:
+    # The first move in order is searched by the engine itself to find a good bound, then the other moves are shared
+    # out to the workers. A search running out of budget in a worker stops the whole search, once the nodes of the
+    # workers still searching are counted
+    def root(self, engine, game, limit):
+        budget = engine.budget
+        geometry = game.geometry
+        key, symmetry = engine.table_key(game)
+        entry = engine.table.lookup(key)
+        stored_move = None if entry is None else geometry.transform_move(entry[3], geometry.inverses[symmetry])
+        moves = list(engine.staged_moves(game, 0, stored_move))
+
+        undo = game.make_move(moves[0])
+        best_value = -engine.negamax(game, -inf, +inf, 1, limit)
+        game.unmake_move(undo)
+        best_move = moves[0]
+
+        self.alpha.value = best_value
+
+        # The workers share what is left of the budget, counting their nodes on from the engine's
+        self.nodes.value = budget.nodes
+        state = pack(game)
+
+        futures = [self.executor.submit(search_move, state, move, limit, self.searches, budget.deadline,
+                                        budget.node_limit, budget.armed) for move in moves[1:]]
+
+        try:
+            # Moves are taken in order, so that the first of equally good moves is kept as in a serial search
+            for move, future in zip(moves[1:], futures):
+                value, alpha, nodes = future.result()
+                budget.nodes += nodes
+
+                if value is None:
+                    self.stop(futures[futures.index(future) + 1:], budget)
+                    raise SearchTimeout
+
+                if value > alpha and value > best_value:
+                    best_value = value
+                    best_move = move
+
+        except BaseException:
+            for future in futures:
+                future.cancel()
+
+            raise
+
+        engine.table.store(key, limit, best_value, EXACT, geometry.transform_move(best_move, symmetry))
+        return best_move, best_value
+
+    # Cancel the root moves not yet taken by a worker and wait for the others, adding their nodes to the budget
+    def stop(self, futures, budget):
+        for future in futures:
+            future.cancel()
+
+        for future in futures:
+            if not future.cancelled():
+                budget.nodes += future.result()[2]
@@ -0,0 +1,57 @@
+# Purpose: Player making the best moves of a solved game, looked up in a database of solved positions
+# Citations: Solved game: https://en.wikipedia.org/wiki/Solved_game
+
+from framework import Player
+from endgame import EndgameDatabase, score, WIN
+
+
+class PerfectPlayer(Player):
+    # Create a player looking games up in the database of a file, which lets another player (such as an alpha-beta
+    # player) move in games that are not in the database:
+    # The player maximizes if the other player does
+    def __init__(self, path, fallback):
+        self.database = EndgameDatabase(path)
+        self.fallback = fallback
+        self.opponent = None
+
+    # Set the player's opponent, which the other player assumes too
+    def assume(self, opponent):
+        self.opponent = opponent
+        self.fallback.assume(opponent.fallback if isinstance(opponent, PerfectPlayer) else opponent)
+
+    # Close the database and the other player
+    def close(self):
+        self.database.close()
+        self.fallback.close()
+
+    # Return whether the player maximizes or not
+    def maximizes(self):
+        return self.fallback.maximizes()
+
+    # Return the move selected by the player:
+    # Every move is made and the game it leads to looked up, and the move that is best for the player is selected.
+    # Winning sooner and losing later are better
+    def move(self, game):
+        best_move = None
+        best_value = None
+
+        for move in game.moves():
+            child = game.child(move, self)
+            utility = child.utility()
+
+            if utility is not None:
+                value = utility * WIN if self.maximizes() else -utility * WIN
+
+            else:
+                found = self.database.lookup_game(child)
+
+                if found is None:
+                    return self.fallback.move(game)
+
+                value = -score(found)
+
+            if best_move is None or value > best_value:
+                best_move = move
+                best_value = value
+
+        return best_move
@@ -0,0 +1,123 @@
+# Purpose: Perft counts of the games reached after a number of plies, to check and time the rules' move generation
+# Citations: Perft: https://www.chessprogramming.org/Perft
+#
+# python perft.py [position] [depth] [--divide] [--copying] [--check]
+#
+# Without a position, every reference position is counted to its reference depth
+
+from argparse import ArgumentParser
+from time import perf_counter
+from morris import MAX_SIDE, MIN_SIDE
+from six_men_morris import SixMensMorris
+from nine_men_morris import NineMensMorris
+
+# Reference positions, by name: the game class, whether the last player maximizes (or None at the beginning of the
+# game), the pieces to place and the bitboards of Max and Min
+POSITIONS = {
+    'nine-start': (NineMensMorris, None, 9, 9, 0, 0),
+    'nine-placement': (NineMensMorris, False, 5, 5, 0x42084, 0x180011),
+    'nine-movement': (NineMensMorris, False, 0, 0, 0xa66284, 0x590551),
+    'nine-flying': (NineMensMorris, False, 0, 0, 0x150000, 0x88928d),
+    'six-start': (SixMensMorris, None, 6, 6, 0, 0),
+    'six-placement': (SixMensMorris, False, 3, 3, 0x2c0, 0x4404),
+    'six-movement': (SixMensMorris, False, 0, 0, 0x12d1, 0xcc04),
+}
+
+# Counts of the games reached after 1, 2, ... plies from each reference position
+REFERENCES = {
+    'nine-start': [24, 552, 12144, 255024],
+    'nine-placement': [16, 240, 3808, 55564],
+    'nine-movement': [24, 142, 2201, 14981, 193513],
+    'nine-flying': [41, 528, 20512],
+    'six-start': [16, 240, 3360, 43680],
+    'six-placement': [12, 111, 1182, 10896, 93446],
+    'six-movement': [7, 32, 266, 1274, 9630],
+}
+
+
+# Return the game of a reference position
+def position(name):
+    cls, last_player, max_pieces, min_pieces, max_bits, min_bits = POSITIONS[name]
+
+    if last_player is not None:
+        last_player = MAX_SIDE if last_player else MIN_SIDE
+
+    return cls.from_bits(last_player, max_pieces, min_pieces, max_bits, min_bits)
+
+
+# Return the number of games reached from a game after a number of plies, not counting games over before then:
+# Moves are made and unmade in place, as in the search, or made on copies of the game with child() as in a played game
+def perft(game, depth, copying=False):
+    if game.utility() is not None:
+        return 0
+
+    if depth == 0:
+        return 1
+
+    count = 0
+
+    if copying:
+        player = MIN_SIDE if game.min_to_move() else MAX_SIDE
+
+        for move in game.moves():
+            count += perft(game.child(move, player), depth - 1, True)
+
+    else:
+        for move in game.moves():
+            undo = game.make_move(move)
+            count += perft(game, depth - 1)
+            game.unmake_move(undo)
+
+    return count
+
+
+# Return the perft count of the games reached through each move of a game, as pairs of the move and its count
+def divide(game, depth, copying=False):
+    player = MIN_SIDE if game.min_to_move() else MAX_SIDE
+    return [(move, perft(game.child(move, player), depth - 1, copying)) for move in game.moves()]
+
+
+# Count the games reached from a reference position after each number of plies up to a depth, print the counts and
+# their speed, and return whether they match the reference counts
+def run(name, depth, copying=False, show_divide=False):
+    game = position(name)
+    expected = REFERENCES.get(name, [])
+    matches = True
+
+    for plies in range(1, depth + 1):
+        start = perf_counter()
+        count = perft(game, plies, copying)
+        seconds = perf_counter() - start
+
+        reference = expected[plies - 1] if plies <= len(expected) else None
+        matches = matches and reference in (None, count)
+        status = "" if reference is None else " ok" if reference == count else " expected %d" % reference
+
+        print("%s depth %d: %d games in %.3f seconds, %d per second%s" %
+              (name, plies, count, seconds, count / seconds if seconds else 0, status))
+
+    if show_divide:
+        for move, count in divide(game, depth, copying):
+            print("  ", move, count)
+
+    return matches
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Count the games reached from a position after a number of plies")
+    parser.add_argument('position', nargs='?', choices=sorted(POSITIONS))
+    parser.add_argument('depth', nargs='?', type=int)
+    parser.add_argument('--divide', action='store_true', help="break the count down by the first move")
+    parser.add_argument('--copying', action='store_true', help="make moves with child() instead of in place")
+    parser.add_argument('--check', action='store_true', help="fail unless every count matches its reference")
+    args = parser.parse_args()
+
+    names = [args.position] if args.position else sorted(POSITIONS)
+    matches = True
+
+    for name in names:
+        depth = args.depth if args.depth is not None else len(REFERENCES.get(name, [])) or 3
+        matches = run(name, depth, args.copying, args.divide) and matches
+
+    if args.check and not matches:
+        raise SystemExit("Perft counts differ from the references")
@@ -0,0 +1,139 @@
+# Purpose: Opt-in profiling of the rules and evaluation functions of a game class, counting the calls, time and memory
+#          of each function and reporting them move by move
+# Citations: tracemalloc: https://docs.python.org/3/library/tracemalloc.html
+#
+# Profiling is turned on for played games and matches by setting MORRIS_PROFILE to 1, or to memory to trace memory
+# too, or for any code with a Profiler used as a context manager. Nothing is wrapped otherwise, so it costs nothing
+# when it is off.
+# tracemalloc only traces the memory allocated at any time, not each allocation, so memory is reported for each
+# function as the most it allocated above what was allocated when a call started, at the peak of any call, and the
+# net bytes its calls left allocated. The peak includes memory allocated and freed again within the call, while the
+# net bytes are negative for a function freeing more than it allocates, such as unmake_move dropping the lists of moves
+
+import os
+import tracemalloc
+from time import perf_counter
+
+# Environment variable turning profiling on
+PROFILE = 'MORRIS_PROFILE'
+
+# Functions of the games that are profiled: the rules, the evaluation and the in-place moves used by the search
+FUNCTIONS = ('child', 'mills', 'moves', 'first_moves', 'later_captures', 'phase2_moves', 'phase3_moves', 'evaluate',
+             'has_mill', 'one_to_mill', 'blocked_pieces', 'make_move', 'unmake_move')
+
+
+class Profiler(object):
+    # Create a profiler of the functions of game classes, which may trace the memory they allocate too
+    def __init__(self, classes, memory=False):
+        self.classes = classes
+        self.memory = memory
+        self.originals = []
+
+        # Calls, seconds, net bytes allocated and bytes at the highest peak of a call of each function of each class,
+        # by class and function name
+        self.counts = {}
+
+        # Memory traced at the peak of each profiled call in progress so far, the innermost last, since a call resets
+        # the peak traced for the calls it is made from
+        self.peaks = []
+
+    # Start profiling when entering a context, and stop when leaving it
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exception):
+        self.stop()
+
+    # Wrap the profiled functions of every class, and start tracing memory if needed
+    def start(self):
+        for cls in self.classes:
+            for name in FUNCTIONS:
+                # Functions inherited by the class are wrapped on the class itself, and removed from it afterwards
+                self.originals.append((cls, name, cls.__dict__.get(name)))
+                setattr(cls, name, self.wrap(cls, name, getattr(cls, name)))
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    # Restore the profiled functions, and stop tracing memory
+    def stop(self):
+        for cls, name, original in reversed(self.originals):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+        self.originals = []
+
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    # Return a function counting the calls, time and memory of a class's function before returning its result
+    def wrap(self, cls, name, function):
+        counts = self.counts.setdefault((cls.__name__, name), [0, 0.0, 0, 0])
+        memory = self.memory
+        peaks = self.peaks
+
+        def profiled(*args, **kwargs):
+            if memory:
+                before, peak = tracemalloc.get_traced_memory()
+
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+
+                tracemalloc.reset_peak()
+                peaks.append(before)
+
+            start = perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                counts[0] += 1
+                counts[1] += perf_counter() - start
+
+                if memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    peak = max(peak, peaks.pop())
+                    counts[2] += current - before
+                    counts[3] = max(counts[3], peak - before)
+
+                    if peaks:
+                        peaks[-1] = max(peaks[-1], peak)
+
+        return profiled
+
+    # Return a report of the functions called since the last report, the slowest first, and start counting again:
+    # Times include the time of the profiled functions called by a function
+    def report(self, title):
+        lines = [title]
+
+        for (cls, name), (calls, seconds, net, peak) in sorted(self.counts.items(), key=lambda item: -item[1][1]):
+            if calls:
+                line = "  %s.%s: %d calls, %.6f seconds" % (cls, name, calls, seconds)
+                lines.append(line + (", %d bytes at the peak of a call, %+d bytes left allocated" % (peak, net)
+                                     if self.memory else ""))
+
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append("  Memory: %d bytes, %d at the peak" % (current, peak))
+            tracemalloc.reset_peak()
+
+        for counts in self.counts.values():
+            counts[:] = [0, 0.0, 0, 0]
+
+        return "\n".join(lines)
+
+
+# Return a started profiler of game classes if profiling is turned on by the environment, or None otherwise
+def from_environment(classes):
+    setting = os.environ.get(PROFILE, '')
+
+    if setting in ('', '0'):
+        return None
+
+    profiler = Profiler(classes, memory=setting == 'memory')
+    profiler.start()
+    return profiler
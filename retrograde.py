@@ -0,0 +1,348 @@
+# Purpose: Retrograde analysis of the endgame tables with NumPy, in passes over arrays of positions instead of one
+#          position at a time, fast enough to solve Nine Men's Morris up to 5 against 4 pieces
+# Citations: Retrograde analysis: https://www.chessprogramming.org/Retrograde_Analysis
+#            NumPy: https://numpy.org/doc/stable/
+#
+# The tables are the same as EndgameSolver.solve_pair() makes, byte for byte, and the positions are indexed the same
+# way. NumPy is optional and only imported once the passes are asked for: without it, the solver solves one position
+# at a time
+
+from endgame import BINOMIAL, LONGEST, DRAW, SAVED, WON, table_size
+from geometry import indices
+
+# NumPy, once imported
+numpy = None
+
+# Positions decoded at once, which bounds the memory taken by the arrays of a pass
+CHUNK = 1 << 20
+
+
+# Return the plies until the end of the games of an array of bytes, as plies() does for one
+def plies_array(values):
+    values = values.astype(numpy.int32)
+    return numpy.where(values & 1, values, values - 2)
+
+
+class RetrogradePasses(object):
+    # Create the passes of a solver, with the rank of every set of points of its board and the sets of each number of
+    # points in increasing order, which is the order of their ranks
+    def __init__(self, solver):
+        self.solver = solver
+        self.geometry = geometry = solver.geometry
+        self.points = points = geometry.size
+        self.full = numpy.uint32(geometry.full)
+
+        every = numpy.arange(1 << points, dtype=numpy.uint32)
+        counts = numpy.bitwise_count(every)
+        self.rank = numpy.zeros(1 << points, dtype=numpy.uint32)
+        self.sets = []
+
+        for count in range(points + 1):
+            members = every[counts == count]
+            self.rank[members] = numpy.arange(len(members), dtype=numpy.uint32)
+            self.sets.append(members)
+
+        # Bits of each point and masks of the points below it
+        self.bits = [numpy.uint32(1 << i) for i in range(points)]
+        self.below = [numpy.uint32((1 << i) - 1) for i in range(points)]
+
+    # Return the bit masks of arrays of sets given as subsets of the points left empty by other sets of a number of
+    # points, the inverse of extract()
+    def deposit(self, subsets, taken, count):
+        free = ~taken & self.full
+        bits = numpy.zeros(len(subsets), dtype=numpy.uint32)
+
+        for slot in range(self.points - count):
+            lowest = free & (~free + numpy.uint32(1))
+            bits |= lowest * ((subsets >> numpy.uint32(slot)) & numpy.uint32(1))
+            free ^= lowest
+
+        return bits
+
+    # Return arrays of sets as subsets of the points of masks with a number of points, in the order of those points
+    def extract(self, bits, masks, count):
+        masks = masks.copy()
+        subsets = numpy.zeros(len(bits), dtype=numpy.uint32)
+
+        for slot in range(count):
+            lowest = masks & (~masks + numpy.uint32(1))
+            subsets |= (bits & lowest != 0).astype(numpy.uint32) << numpy.uint32(slot)
+            masks ^= lowest
+
+        return subsets
+
+    # Return whether the pieces of arrays of sets complete a mill through a point
+    def forms_mill(self, bits, point):
+        mill = numpy.zeros(len(bits), dtype=bool)
+
+        for line in self.geometry.point_mills[point]:
+            mill |= bits & numpy.uint32(line) == line
+
+        return mill
+
+    # Return the indices of positions in their table, given the player to move's pieces and the opponent's
+    def index(self, own_bits, other_bits, own, other):
+        empty = self.points - own
+        subsets = self.extract(other_bits, ~own_bits & self.full, empty)
+        return self.rank[own_bits].astype(numpy.int64) * BINOMIAL[empty][other] + self.rank[subsets]
+
+    # Return the pieces of the player to move and of the opponent of positions given by their indices in their table
+    def positions(self, ks, own, other):
+        width = BINOMIAL[self.points - own][other]
+        own_bits = self.sets[own][ks // width]
+        return own_bits, self.deposit(self.sets[other][ks % width], own_bits, own)
+
+    # Solve the tables of positions with a number of pieces for the player to move and for the opponent, and of the
+    # positions with the numbers swapped, as EndgameSolver.solve_pair() does:
+    # Every position is first tallied with its moves in passes over chunks of the tables, then the positions are
+    # settled in order of their distance to the end of the game, a chunk of the positions at each distance at a time
+    def solve_pair(self, own, other):
+        points = self.points
+        pairs = [(own, other)] if own == other else [(own, other), (other, own)]
+        self.starts = {pairs[0]: 0}
+        size = table_size(points, own, other)
+
+        if own != other:
+            self.starts[pairs[1]] = size
+            size *= 2
+
+        self.values = numpy.zeros(size, dtype=numpy.uint8)
+        self.counts = numpy.zeros(size, dtype=numpy.uint8)
+        # Plies to the end of the game of a position's longest loss so far, or of the win it is queued for
+        self.longest = numpy.zeros(size, dtype=numpy.uint8)
+        self.flags = numpy.zeros(size, dtype=numpy.uint8)
+
+        # Positions waiting to be settled as wins and as losses, by their distance to the end of the game, as arrays of
+        # their indices
+        self.wins = [[] for plies in range(LONGEST + 2)]
+        self.losses = [[] for plies in range(LONGEST + 2)]
+
+        for pair in pairs:
+            self.tally(*pair)
+
+        for distance in range(LONGEST + 2):
+            for won, queue in ((True, self.wins), (False, self.losses)):
+                # Only the last distance, where longer ones are kept, can be queued again while it is settled
+                while queue[distance]:
+                    ks = numpy.unique(numpy.concatenate(queue[distance]))
+                    queue[distance] = []
+                    ks = ks[self.values[ks] == 0]
+                    self.values[ks] = min(distance, LONGEST) if won else min(distance + 2, LONGEST + 1)
+
+                    for start in range(0, len(ks), CHUNK):
+                        self.settle(ks[start:start + CHUNK], distance, won)
+
+            self.wins[distance] = self.losses[distance] = None
+
+        for pair in pairs:
+            start = self.starts[pair]
+            self.solver.tables[(0, 0) + pair] = self.values[start:start + table_size(points, *pair)]
+
+        self.values = self.counts = self.longest = self.flags = None
+
+    # Queue positions given by their indices as wins in a number of plies, unless they are queued for a win as short
+    def queue_wins(self, ks, distance):
+        distance = min(distance, LONGEST + 1)
+        ks = ks[(self.flags[ks] & WON == 0) | (self.longest[ks] > distance)]
+
+        if len(ks):
+            self.flags[ks] |= WON
+            self.longest[ks] = distance
+            self.wins[distance].append(ks)
+
+    # Queue positions given by their indices as losses, each at the distance of its longest loss
+    def queue_losses(self, ks):
+        longest = self.longest[ks]
+
+        for distance in numpy.unique(longest):
+            self.losses[distance].append(ks[longest == distance])
+
+    # Tally every position of a table with the moves of the player to move: Moves that take a piece off the board
+    # lead to tables already solved, and the others are counted
+    def tally(self, own, other):
+        points = self.points
+        start = self.starts[own, other]
+        width = BINOMIAL[points - own][other]
+        rows = max(1, CHUNK // width)
+        subsets = self.sets[other][:width]
+        flying = own == 3 and self.geometry.flying
+        smaller = None
+
+        if other > 3:
+            smaller = numpy.frombuffer(self.solver.tables[0, 0, other - 1, own], dtype=numpy.uint8)
+
+        for row in range(0, BINOMIAL[points][own], rows):
+            own_sets = self.sets[own][row:row + rows]
+            own_bits = numpy.repeat(own_sets, width)
+            other_bits = self.deposit(numpy.tile(subsets, len(own_sets)), own_bits, own)
+            empty = ~(own_bits | other_bits) & self.full
+
+            n = len(own_bits)
+            counts = numpy.zeros(n, dtype=numpy.int32)
+            saved = numpy.zeros(n, dtype=bool)
+            fastest = numpy.full(n, LONGEST + 2, dtype=numpy.int32)
+            longest = numpy.zeros(n, dtype=numpy.int32)
+
+            # Each move closing a mill, given as the positions it is made from and the player's pieces after it, takes
+            # a piece off the board
+            def capture(found, moved):
+                if other == 3:
+                    saved[found] = True
+                    fastest[found] = 1
+                    return
+
+                self.capture(found, moved, other_bits[found], own, other, smaller, saved, fastest, longest)
+
+            if flying:
+                # Three pieces may fly to any empty point, and close a mill with the two others
+                counts += 3 * numpy.bitwise_count(empty).astype(numpy.int32)
+
+                for line in self.geometry.mills:
+                    for j in indices(line):
+                        pair = numpy.uint32(line ^ (1 << j))
+                        found = numpy.flatnonzero((own_bits & pair == pair) & (empty & self.bits[j] != 0))
+
+                        if len(found):
+                            counts[found] -= 1
+                            capture(found, numpy.full(len(found), line, dtype=numpy.uint32))
+
+            else:
+                for i in range(points):
+                    has = own_bits & self.bits[i] != 0
+
+                    for j in indices(self.geometry.neighbours[i]):
+                        found = numpy.flatnonzero(has & (empty & self.bits[j] != 0))
+
+                        if not len(found):
+                            continue
+
+                        moved = own_bits[found] ^ (self.bits[i] | self.bits[j])
+                        mill = self.forms_mill(moved, j)
+                        counts[found[~mill]] += 1
+
+                        if mill.any():
+                            capture(found[mill], moved[mill])
+
+            ks = numpy.arange(start + row * width, start + row * width + n, dtype=numpy.int64)
+            self.counts[ks] = counts
+            self.flags[ks] = numpy.where(saved, SAVED, 0)
+            self.longest[ks] = longest
+
+            won = fastest <= LONGEST + 1
+            for distance in numpy.unique(fastest[won]):
+                self.queue_wins(ks[won & (fastest == distance)], int(distance))
+
+            self.queue_losses(ks[(counts == 0) & ~saved & ~won])
+
+    # Look up the tables solved before for the pieces of the opponent that moves closing a mill may take, and keep the
+    # fastest win, whether the position is saved and the longest loss of the positions they are made from
+    def capture(self, found, moved, other_bits, own, other, smaller, saved, fastest, longest):
+        protected = numpy.zeros(len(found), dtype=numpy.uint32)
+
+        for line in self.geometry.mills:
+            line = numpy.uint32(line)
+            protected |= numpy.where(other_bits & line == line, line, numpy.uint32(0))
+
+        # Pieces in mills may only be taken when every piece is in one
+        targets = other_bits & ~protected
+        targets = numpy.where(targets == 0, other_bits, targets)
+
+        for t in range(self.points):
+            chosen = numpy.flatnonzero(targets & self.bits[t])
+
+            if not len(chosen):
+                continue
+
+            values = smaller[self.index(other_bits[chosen] ^ self.bits[t], moved[chosen], other - 1, own)]
+            at = found[chosen]
+            lost = values & 1 == 1
+            distance = numpy.minimum(plies_array(values) + 1, LONGEST + 1)
+
+            longest[at[lost]] = numpy.maximum(longest[at[lost]], distance[lost])
+            saved[at[~lost]] = True
+
+            decided = ~lost & (values != DRAW)
+            fastest[at[decided]] = numpy.minimum(fastest[at[decided]], plies_array(values[decided]) + 1)
+
+    # Settle the positions that could have moved into positions settled at a distance, given by their indices: A move
+    # into a lost position wins, and a position whose moves all lead to wins for the opponent is lost
+    def settle(self, ks, distance, won):
+        earlier = self.unmoves(ks)
+        earlier = earlier[self.values[earlier] == 0]
+
+        if not won:
+            self.queue_wins(numpy.unique(earlier), distance + 1)
+            return
+
+        # Positions queued as wins need no more counting
+        earlier = earlier[self.flags[earlier] & WON == 0]
+        earlier, moves = numpy.unique(earlier, return_counts=True)
+
+        self.longest[earlier] = numpy.maximum(self.longest[earlier], min(distance + 1, LONGEST + 1))
+        self.counts[earlier] -= moves.astype(numpy.uint8)
+        self.queue_losses(earlier[(self.counts[earlier] == 0) & (self.flags[earlier] & SAVED == 0)])
+
+    # Return the indices of the positions from which the opponent could have moved into positions given by their
+    # indices without forming a mill:
+    # The opponent's pieces are the player to move's in those positions, and the pieces of the player to move are
+    # ranked among the points the opponent's pieces leave empty, which change by two points with each move
+    def unmoves(self, ks):
+        points = self.points
+        found = []
+
+        for (own, other), start in self.starts.items():
+            size = table_size(points, own, other)
+            local = ks[(ks >= start) & (ks < start + size)] - start
+
+            if not len(local):
+                continue
+
+            own_bits, other_bits = self.positions(local, own, other)
+            free = ~other_bits & self.full
+            ranks = self.extract(own_bits, free, points - other)
+            empty = free & ~own_bits
+            earlier_start = self.starts[other, own]
+            width = BINOMIAL[points - other][own]
+            flying = other == 3 and self.geometry.flying
+
+            for j in range(points):
+                moved = numpy.flatnonzero((other_bits & self.bits[j] != 0) & ~self.forms_mill(other_bits, j))
+
+                if not len(moved):
+                    continue
+
+                # The point the piece moved to is left empty before the move, which adds it to the points ranked
+                # among
+                slot = numpy.bitwise_count(free[moved] & self.below[j]).astype(numpy.uint32)
+                low = (numpy.uint32(1) << slot) - numpy.uint32(1)
+                added = (ranks[moved] & low) | ((ranks[moved] & ~low) << numpy.uint32(1))
+                before = free[moved] | self.bits[j]
+                sources = range(points) if flying else indices(self.geometry.neighbours[j])
+
+                for i in sources:
+                    came = numpy.flatnonzero(empty[moved] & self.bits[i])
+
+                    if not len(came):
+                        continue
+
+                    # The point the piece moved from is taken before the move, which removes it
+                    slot = numpy.bitwise_count(before[came] & self.below[i]).astype(numpy.uint32)
+                    low = (numpy.uint32(1) << slot) - numpy.uint32(1)
+                    removed = (added[came] & low) | ((added[came] >> numpy.uint32(1)) & ~low)
+                    mover = other_bits[moved[came]] ^ (self.bits[j] | self.bits[i])
+                    found.append(earlier_start + self.rank[mover].astype(numpy.int64) * width + self.rank[removed])
+
+        return numpy.concatenate(found) if found else numpy.zeros(0, dtype=numpy.int64)
+
+
+# Return the passes of a solver, or None without NumPy
+def passes(solver):
+    global numpy
+
+    if numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+
+    return RetrogradePasses(solver)
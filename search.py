@@ -0,0 +1,301 @@
+# Purpose: Configurable negamax alpha-beta search engine used by every alpha-beta player
+# Citations: Artifical Intelligence Text Book
+#            Negamax: https://www.chessprogramming.org/Negamax
+
+from transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER, bound
+from deepening import Budget, deepen
+from ordering import MoveOrdering
+from parallel import ParallelRoot
+from lazy_smp import LazySMP
+from endgame import EndgameDatabase, WIN
+from book import OpeningBook
+from stats import SearchStats
+from morris import MAX_SIDE, MIN_SIDE
+from time import time
+from math import inf
+
+# Depth at which the search stops and estimates the outcome of a game
+DEPTH = 5
+
+# Deepest search made within a time or node budget
+MAX_DEPTH = 64
+
+
+class SearchConfig(object):
+    # Settings of a search:
+    # The search goes to a fixed depth, unless it is given a time (in seconds) or node budget for each move. It then
+    # deepens one ply at a time up to the depth given, or MAX_DEPTH without one, and makes the move of the deepest
+    # search completed within the budget. The transposition table has a number of slots, killer moves and the history
+    # heuristic may be turned off, and games are estimated with their own feature weights unless others are given.
+    # With more than one worker, the moves at the root are searched in parallel by that many processes, or with Lazy
+    # SMP the whole game is searched by that many processes sharing a transposition table. Games found in the endgame
+    # database of a file, if one is given, are not searched further. Games may be stored in the transposition table in
+    # their canonical form, so that symmetric games share their entries. This is off by default, since finding the
+    # canonical form of every game costs more time than the shared entries save. Games found in the opening book of a
+    # file, if one is given, are not searched at all. A move closing a mill is searched taking the most threatening of
+    # the opponent's pieces first, and taking the next ones in order of threat only up to a number of pieces, to keep
+    # the branching factor down. With None, every piece the move may take is searched
+    def __init__(self, depth=None, time_limit=None, node_limit=None, table_size=1 << 18, killers=True, history=True,
+                 weights=None, workers=1, smp=False, endgames=None, symmetry=False, book=None, captures=2):
+        if depth is None:
+            depth = DEPTH if time_limit is None and node_limit is None else MAX_DEPTH
+
+        self.depth = depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.table_size = table_size
+        self.killers = killers
+        self.history = history
+        self.weights = weights
+        self.workers = workers
+        self.smp = smp
+        self.endgames = endgames
+        self.symmetry = symmetry
+        self.book = book
+        self.captures = captures
+
+    # Return whether the search deepens within a budget instead of going to a fixed depth
+    def deepens(self):
+        return self.time_limit is not None or self.node_limit is not None
+
+    # Return whether searches with another configuration give games the same values, so that their engines may share
+    # their transposition tables and move ordering
+    def values_alike(self, other):
+        return self.weights == other.weights and self.endgames == other.endgames
+
+
+class SearchEngine(object):
+    # Create an engine with a configuration, by default a fixed depth search, and optionally the table it uses and a
+    # function called with the statistics of each search for a move
+    def __init__(self, config=None, table=None, callback=None):
+        self.config = config = config or SearchConfig()
+        parallel = config.workers > 1
+
+        # Remember the values of games searched before, the moves that pruned the search, and count the nodes
+        # searched for a move. Lazy SMP needs a table in shared memory
+        if table is None:
+            table = SharedTranspositionTable(config.table_size) if parallel and config.smp else \
+                TranspositionTable(config.table_size)
+
+        self.table = table
+        self.ordering = MoveOrdering(self.config.killers, self.config.history)
+        self.budget = Budget()
+
+        # Best move found at the root of the last search, and its value for the player to move
+        self.root_move = None
+        self.root_value = None
+
+        # Statistics of the last search
+        self.stats = SearchStats()
+        self.callback = callback
+
+        # Solved endgames, if the engine has any
+        self.endgames = EndgameDatabase(config.endgames) if config.endgames is not None else None
+
+        # Moves of the opening, if the engine has a book
+        self.book = OpeningBook(config.book) if config.book is not None else None
+
+        # Worker processes for searching in parallel, if the engine has any
+        self.pool = None
+
+        if parallel:
+            self.pool = LazySMP(self, config.workers) if config.smp else ParallelRoot(self, config.workers)
+
+    # Return whether the engine searches with Lazy SMP
+    def smp(self):
+        return self.pool is not None and self.config.smp
+
+    # Share the transposition table, move ordering and budget of another engine, such as the opponent's:
+    # The table and ordering are only shared if the engines value games alike, since the values stored by one would
+    # otherwise answer the other's searches. An engine searching with Lazy SMP keeps the shared table its helpers are
+    # attached to
+    def share(self, other):
+        if self.config.values_alike(other.config):
+            if not self.smp():
+                self.table = other.table
+
+            self.ordering = other.ordering
+
+        self.budget = other.budget
+
+    # Stop the engine's worker processes, if it has any, and release its shared table
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+
+        if self.smp():
+            self.table.close(unlink=True)
+
+        if self.endgames is not None:
+            self.endgames.close()
+
+        if self.book is not None:
+            self.book.close()
+
+    # Return the best move for the player to move in a game, and keep the statistics of its search
+    def search(self, game):
+        stats = self.stats = SearchStats()
+        start = time()
+        self.budget.start()
+
+        move = self.find_move(game)
+
+        stats.nodes = self.budget.nodes
+        stats.seconds = time() - start
+
+        if self.callback is not None:
+            self.callback(stats)
+
+        return move
+
+    # Return the best move for the player to move in a game:
+    # Book moves are made without searching. The search makes and unmakes moves on its own copy of the game
+    def find_move(self, game):
+        if self.book is not None:
+            self.stats.book_probes += 1
+            move = self.book.move(game)
+
+            if move is not None:
+                self.stats.book_hits += 1
+                return move
+
+        self.table.new_search()
+        self.ordering.new_search()
+        game = game.copy()
+
+        if self.pool is not None:
+            self.pool.new_search()
+
+        if self.smp():
+            return self.pool.search(self, game)
+
+        if not self.config.deepens():
+            return self.root(game, self.config.depth)
+
+        return deepen(self, game)
+
+    # Return the key of a game in the transposition table, and the symmetry mapping the game onto the game stored
+    # under that key, whose moves are mapped back with the inverse symmetry
+    def table_key(self, game):
+        if self.config.symmetry:
+            return game.canonical_key()
+
+        return game.key, 0
+
+    # Search a game to a depth limit and return the best move found:
+    # Searches deeper than one ply share the root moves out to the worker processes, if there are any. The time and
+    # nodes of the search are kept once it completes
+    def root(self, game, limit):
+        self.root_move = None
+        start = time()
+        nodes = self.budget.nodes
+
+        if self.pool is not None and not self.config.smp and limit > 1 and len(game.first_moves()) > 1:
+            self.root_move, self.root_value = self.pool.root(self, game, limit)
+
+        else:
+            self.root_value = self.negamax(game, -inf, +inf, 0, limit)
+
+        self.stats.depths.append((limit, time() - start, self.budget.nodes - nodes))
+        return self.root_move
+
+    # Return the value of a game for the player to move, searched from a depth down to a depth limit:
+    # Utilities and estimates are given for Max, so they are negated when Min is to move
+    def negamax(self, game, alpha, beta, depth, limit):
+        self.budget.tick()
+        stats = self.stats
+        min_to_move = game.min_to_move()
+
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+        # Is the game over? Won games are worth more than any estimate
+        utility = game.utility()
+
+        if utility is not None:
+            return -utility * WIN if min_to_move else utility * WIN
+
+        # Is the outcome of the game already known? The root is still searched for the move to make
+        if self.endgames is not None and depth > 0:
+            stats.endgame_probes += 1
+            value = self.endgames.probe(game)
+
+            if value is not None:
+                stats.endgame_hits += 1
+                return value
+
+        # Check if we have reached the maximum search depth and estimate the outcome of the game for the player to move
+        if depth >= limit:
+            stats.leaves += 1
+
+            if min_to_move:
+                return -game.evaluate(MIN_SIDE, self.config.weights)
+
+            return game.evaluate(MAX_SIDE, self.config.weights)
+
+        # Has the game already been searched deep enough to answer for this window?
+        key, symmetry = self.table_key(game)
+        entry = self.table.lookup(key)
+        stored_move = None
+        stats.table_probes += 1
+
+        if entry is not None:
+            stats.table_hits += 1
+            searched, stored_value, kind, stored_move = entry
+
+            if symmetry:
+                stored_move = game.geometry.transform_move(stored_move, game.geometry.inverses[symmetry])
+
+            if searched >= limit - depth and (kind == EXACT or (kind == LOWER and stored_value >= beta) or
+                                              (kind == UPPER and stored_value <= alpha)):
+                if depth == 0:
+                    self.root_move = stored_move
+
+                return stored_value
+
+        window = alpha, beta
+
+        # Which move leads to the best outcome?
+        best_value = -inf
+        best_move = None
+        searched = 0
+
+        for move in self.staged_moves(game, depth, stored_move):
+            searched += 1
+            undo = game.make_move(move)
+            value = -self.negamax(game, -beta, -alpha, depth + 1, limit)
+            game.unmake_move(undo)
+
+            if best_move is None or value > best_value:
+                best_value = value
+                best_move = move
+
+            # Pruning
+            alpha = max(alpha, best_value)
+            if beta <= alpha:
+                stats.cutoffs += 1
+
+                if searched == 1:
+                    stats.first_cutoffs += 1
+
+                self.ordering.cutoff(move, depth, limit - depth)
+                break
+
+        # Remember the value, or the bound on it if the search was pruned
+        self.table.store(key, limit - depth, best_value, bound(best_value, *window),
+                         game.geometry.transform_move(best_move, symmetry) if symmetry else best_move)
+
+        if depth == 0:
+            self.root_move = best_move
+
+        return best_value
+
+    # Yield the moves of a game in the order they are searched at a depth: the best move of the earlier search first,
+    # then the moves likely to be good. Moves closing a mill take the most threatening piece first, and the moves
+    # taking the other pieces are only generated and searched once every other move has failed to prune the search
+    def staged_moves(self, game, depth, stored_move):
+        moves = game.first_moves()
+        yield from self.ordering.order(game, moves, depth, stored_move)
+
+        if self.config.captures != 1:
+            yield from self.ordering.order(game, game.later_captures(moves, self.config.captures), depth, stored_move)
@@ -0,0 +1,136 @@
+# Purpose: Search regression benchmark of the alpha-beta players on a fixed suite of positions, compared against a
+#          stored baseline
+# Citations: Engine testing: https://www.chessprogramming.org/Engine_Testing
+#
+# python search_benchmark.py [--baseline FILE] [--write] [--max-slowdown FRACTION] [--repeat N]
+#
+# The suite is searched by each variant's Max player at its default depth. A run fails if any best move or node count
+# differs from the baseline's, or if the whole suite takes longer than the baseline by more than the slowdown allowed.
+# Scores are reported against the baseline too, since a change in them shows the search changed.
+#
+# Times are kept relative to a perft count timed in the same run, so that a baseline written on one machine still holds
+# on another
+
+import json
+from argparse import ArgumentParser
+from time import perf_counter
+from perft import POSITIONS, position, perft
+import alphabeta6
+import alphabeta9
+
+# Baseline file, the slowdown of the whole suite allowed over the baseline, and the searches of each position of which
+# the fastest is timed
+BASELINE = 'search_baseline.json'
+MAX_SLOWDOWN = 0.25
+REPEAT = 3
+
+# Reference position and depth of the perft count the searches are timed against
+CALIBRATION = ('nine-start', 3)
+
+# Max player of each variant
+PLAYERS = {'SixMensMorris': alphabeta6.MaxPlayer, 'NineMensMorris': alphabeta9.MaxPlayer}
+
+
+# Return the time taken by the calibration perft count
+def calibrate():
+    name, depth = CALIBRATION
+    game = position(name)
+
+    start = perf_counter()
+    perft(game, depth)
+    return perf_counter() - start
+
+
+# Search every position of the suite with new players a number of times and return the results by position: the depth
+# searched, the nodes searched, the fastest time taken to reach the depth relative to the calibration, the best move
+# and its value:
+# The calibration is timed before every search, and its fastest time over the searches of a position is used, so that
+# both are timed under the same load on the machine
+def run(repeat=REPEAT):
+    results = {}
+
+    for name in sorted(POSITIONS):
+        game = position(name)
+        seconds = []
+        calibrations = []
+
+        for attempt in range(repeat):
+            calibrations.append(calibrate())
+            player = PLAYERS[type(game).__name__]()
+            engine = player.engine
+
+            start = perf_counter()
+            move = player.move(game)
+            seconds.append(perf_counter() - start)
+            engine.close()
+
+        results[name] = {'depth': engine.config.depth, 'nodes': engine.budget.nodes,
+                         'time': round(min(seconds) / min(calibrations), 4), 'move': list(move),
+                         'score': engine.root_value}
+
+    return results
+
+
+# Compare the results of a run with a baseline, print the differences and return whether the run passes
+def compare(results, baseline, max_slowdown=MAX_SLOWDOWN):
+    passes = True
+
+    for name, result in results.items():
+        expected = baseline.get(name)
+
+        if expected is None:
+            print(name, "is not in the baseline")
+            continue
+
+        notes = []
+
+        if result['move'] != expected['move']:
+            notes.append("move %s instead of %s" % (result['move'], expected['move']))
+            passes = False
+
+        if result['score'] != expected['score']:
+            notes.append("score %s instead of %s" % (result['score'], expected['score']))
+
+        if result['nodes'] != expected['nodes']:
+            notes.append("%+.1f%% nodes" % (100 * (result['nodes'] / expected['nodes'] - 1)))
+            passes = False
+
+        print("%s: %d nodes in %.3f calibrations (%.3f before)%s" % (name, result['nodes'], result['time'],
+                                                                    expected['time'], ", " + ", ".join(notes) if notes
+                                                                    else ""))
+
+    time = sum(result['time'] for name, result in results.items() if name in baseline)
+    before = sum(baseline[name]['time'] for name in results if name in baseline)
+    slowdown = time / before - 1 if before else 0
+    print("Suite: %.3f calibrations, %+.1f%% against the baseline" % (time, 100 * slowdown))
+
+    if slowdown > max_slowdown:
+        print("Slower than the %.0f%% allowed" % (100 * max_slowdown))
+        passes = False
+
+    return passes
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description="Benchmark the alpha-beta players' searches against a baseline")
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--write', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN,
+                        help="fraction by which the suite may be slower than the baseline")
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="searches of each position, the fastest timed")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    if args.write:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+
+        print("Baseline written to", args.baseline)
+
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+        if not compare(results, baseline, args.max_slowdown):
+            raise SystemExit("The search regressed against the baseline")
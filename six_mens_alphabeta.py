@@ -9,4 +9,9 @@ max_player.assume(min_player)
 min_player.assume(max_player)
 
 game = SixMensMorris()
-game.play(max_player, min_player)
+try:
+    game.play(max_player, min_player)
+
+finally:
+    max_player.close()
+    min_player.close()
@@ -0,0 +1,18 @@
+# Search the openings of Six Men's Morris up to a number of plies (6 by default) one ply deeper than the players, and
+# write their moves to an opening book file for the alpha-beta players:
+# python six_mens_book.py [plies] [file]
+
+import sys
+from book import BookBuilder, PLIES
+from search import SearchConfig, SearchEngine
+from alphabeta6 import DEPTH
+from six_men_morris import SixMensMorris
+
+plies = int(sys.argv[1]) if len(sys.argv) > 1 else PLIES
+path = sys.argv[2] if len(sys.argv) > 2 else 'six_mens_book.db'
+
+builder = BookBuilder(SixMensMorris, SearchEngine(SearchConfig(DEPTH + 1)), plies)
+builder.build()
+builder.write(path)
+
+print(len(builder.moves), "games in the book")
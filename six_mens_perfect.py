@@ -0,0 +1,19 @@
+# Test of the perfect player against the alpha-beta mini-max agent with depth limiting on Six Men's Morris board:
+# The database is written by six_mens_solver.py
+
+from alphabeta6 import MaxPlayer, MinPlayer
+from perfect import PerfectPlayer
+from six_men_morris import SixMensMorris
+max_player = PerfectPlayer('six_mens_solved.db', MaxPlayer())
+min_player = MinPlayer()
+
+max_player.assume(min_player)
+min_player.assume(max_player.fallback)
+
+game = SixMensMorris()
+try:
+    game.play(max_player, min_player)
+
+finally:
+    max_player.close()
+    min_player.close()
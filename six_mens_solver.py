@@ -0,0 +1,15 @@
+# Solve Six Men's Morris, from the empty board to every endgame, and write the value of every position to a database
+# file for the perfect player:
+# python six_mens_solver.py [file]
+
+import sys
+from endgame import EndgameSolver, score
+from six_men_morris import SixMensMorris
+
+path = sys.argv[1] if len(sys.argv) > 1 else 'six_mens_solved.db'
+
+solver = EndgameSolver(SixMensMorris)
+solver.solve_placement()
+solver.write(path)
+
+print("Value of the empty board for Max:", score(solver.value(0, 0, 6, 6)))
@@ -0,0 +1,65 @@
+# Purpose: Statistics of a search for a move, filled in by the search engine for monitoring and tuning
+# Citations: Branching factor: https://www.chessprogramming.org/Branching_Factor
+#            Move ordering: https://www.chessprogramming.org/Move_Ordering
+
+
+# Return the fraction of probes that were hits, or None without any probe
+def rate(hits, probes):
+    return hits / probes if probes else None
+
+
+class SearchStats(object):
+    # Start a search with nothing counted:
+    # Nodes include those searched by worker processes, while the other counts are made by the engine's own process
+    def __init__(self):
+        self.nodes = 0
+        self.seconds = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.first_cutoffs = 0
+        self.max_depth = 0
+
+        # Depth limit, time taken and nodes searched by each search to a depth limit that completed
+        self.depths = []
+
+        # Probes of the transposition table, the endgame database and the opening book, and those that found the game
+        self.table_probes = 0
+        self.table_hits = 0
+        self.endgame_probes = 0
+        self.endgame_hits = 0
+        self.book_probes = 0
+        self.book_hits = 0
+
+    # Return the fraction of cutoffs made by the first move searched, which shows how well the moves are ordered
+    def first_cutoff_rate(self):
+        return rate(self.first_cutoffs, self.cutoffs)
+
+    # Return the effective branching factor: the ratio of the nodes of the last two completed searches, or the root
+    # of the nodes by the depth limit after a single one
+    def branching_factor(self):
+        if len(self.depths) > 1 and self.depths[-2][2]:
+            return self.depths[-1][2] / self.depths[-2][2]
+
+        if self.depths:
+            depth, seconds, nodes = self.depths[-1]
+            return nodes ** (1 / depth)
+
+        return None
+
+    # Return the fraction of transposition table probes that found an entry
+    def table_hit_rate(self):
+        return rate(self.table_hits, self.table_probes)
+
+    # Return the fraction of endgame database probes that found the game
+    def endgame_hit_rate(self):
+        return rate(self.endgame_hits, self.endgame_probes)
+
+    # Return the statistics as a dictionary of plain values, for logging or monitoring
+    def as_dict(self):
+        return {'nodes': self.nodes, 'seconds': self.seconds, 'leaves': self.leaves, 'cutoffs': self.cutoffs,
+                'first_cutoff_rate': self.first_cutoff_rate(), 'branching_factor': self.branching_factor(),
+                'max_depth': self.max_depth,
+                'depths': [{'depth': depth, 'seconds': seconds, 'nodes': nodes} for depth, seconds, nodes in self.depths],
+                'table_probes': self.table_probes, 'table_hit_rate': self.table_hit_rate(),
+                'endgame_probes': self.endgame_probes, 'endgame_hit_rate': self.endgame_hit_rate(),
+                'book_probes': self.book_probes, 'book_hits': self.book_hits}
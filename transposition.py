@@ -0,0 +1,161 @@
+# Purpose: Bounded transposition table for remembering the values of games already searched
+# Citations: Transposition table: https://www.chessprogramming.org/Transposition_Table
+#            Lockless hashing: https://www.chessprogramming.org/Shared_Hash_Table#Lockless
+
+from multiprocessing.shared_memory import SharedMemory
+from struct import pack, unpack
+
+# Kinds of values stored: the exact value of a game, or a bound on it found when the search was pruned
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+# Return the kind of value found by a search of a game with the given alpha-beta window
+def bound(value, alpha, beta):
+    if value <= alpha:
+        return UPPER
+
+    if value >= beta:
+        return LOWER
+
+    return EXACT
+
+
+class TranspositionTable(object):
+    # Create a table with a fixed number of slots indexed by the games' Zobrist keys
+    def __init__(self, size=1 << 18):
+        self.size = size
+        self.slots = [None] * size
+
+        # Searches are numbered so that entries left from earlier moves can be replaced first
+        self.generation = 0
+
+    # Start a new search for a move
+    def new_search(self):
+        self.generation += 1
+
+    # Forget every stored game
+    def clear(self):
+        self.slots = [None] * self.size
+        self.generation = 0
+
+    # Return the entry (remaining depth, value, kind, best move) stored for a game, or None if there is no such entry
+    def lookup(self, key):
+        entry = self.slots[key % self.size]
+
+        if entry is not None and entry[0] == key:
+            return entry[1:5]
+
+        return None
+
+    # Store the value of a game searched to a remaining depth:
+    # Deeper searches are kept over shallower ones unless they were made for an earlier move
+    def store(self, key, depth, value, kind, move):
+        index = key % self.size
+        entry = self.slots[index]
+
+        if entry is None or entry[0] == key or entry[1] <= depth or entry[5] != self.generation:
+            self.slots[index] = (key, depth, value, kind, move, self.generation)
+
+
+# Every slot of a shared table holds three 64-bit words: the key XORed with the other two words, the packed entry
+# (remaining depth, kind, generation and best move) and the value as a double
+SLOT_WORDS = 3
+MASK = (1 << 64) - 1
+
+
+# Pack a move into 16 bits, as 5 bits per location (its point index plus one) for up to three locations
+def pack_move(move):
+    code = 0
+
+    if move is not None:
+        for i in range(0, len(move), 2):
+            code = (code << 5) | (move[i] * 8 + move[i + 1] + 1)
+
+    return code
+
+
+# Unpack a move packed into 16 bits, or return None for no move
+def unpack_move(code):
+    if not code:
+        return None
+
+    move = ()
+    while code:
+        i = (code & 31) - 1
+        move = (i >> 3, i & 7) + move
+        code >>= 5
+
+    return move
+
+
+class SharedTranspositionTable(object):
+    # Create a table with a fixed number of slots in shared memory, or attach to the memory of an existing table by
+    # its name, so that processes searching in parallel share what they find:
+    # Entries are written without locks. A slot's first word is the key XORed with the rest of the entry, so an entry
+    # torn by two processes writing at once no longer matches its key and is ignored
+    def __init__(self, size=1 << 18, name=None):
+        self.size = size
+        self.memory = SharedMemory(name, create=name is None, size=size * SLOT_WORDS * 8)
+        self.name = self.memory.name
+        self.words = self.memory.buf.cast('Q')
+        self.values = self.memory.buf.cast('d')
+
+        # Searches are numbered so that entries left from earlier moves can be replaced first
+        self.generation = 0
+
+    # Start a new search for a move
+    def new_search(self):
+        self.generation += 1
+
+    # Forget every stored game
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+        self.generation = 0
+
+    # Release the table's memory, removing it once the process that created it is done with it
+    def close(self, unlink=False):
+        self.release()
+
+        if unlink:
+            self.memory.unlink()
+
+    # Release the views of the table's memory and then the memory itself, which cannot be closed while they exist
+    def release(self):
+        self.words.release()
+        self.values.release()
+        self.memory.close()
+
+    # Release the table's memory when it is garbage collected without being closed
+    def __del__(self):
+        if hasattr(self, 'values'):
+            self.release()
+
+    # Return the entry (remaining depth, value, kind, best move) stored for a game, or None if there is no such entry:
+    # The value is decoded from the word that was checked against the key, since the slot may be written again by
+    # another process before a second read
+    def lookup(self, key):
+        index = (key % self.size) * SLOT_WORDS
+        words = self.words
+        check, entry, value = words[index], words[index + 1], words[index + 2]
+
+        if entry and check ^ entry ^ value == key:
+            return entry & 0xFF, unpack('d', pack('Q', value))[0], (entry >> 8) & 3, unpack_move(entry >> 18)
+
+        return None
+
+    # Store the value of a game searched to a remaining depth:
+    # Deeper searches are kept over shallower ones unless they were made for an earlier move
+    def store(self, key, depth, value, kind, move):
+        index = (key % self.size) * SLOT_WORDS
+        words = self.words
+        check, entry = words[index], words[index + 1]
+        generation = self.generation & 0xFF
+
+        if entry == 0 or check ^ entry ^ words[index + 2] == key or entry & 0xFF <= depth or \
+                (entry >> 10) & 0xFF != generation:
+            entry = depth | (kind << 8) | (generation << 10) | (pack_move(move) << 18)
+            self.values[index + 2] = value
+            words[index + 1] = entry
+            words[index] = (key ^ entry ^ words[index + 2]) & MASK
@@ -0,0 +1,45 @@
+# Title: Twelve Men's Morris Game Project
+# Citations: Twelve Men's Morris Game Description: https://en.wikipedia.org/wiki/Nine_men%27s_morris#Twelve_men's_morris
+
+from nine_men_morris import NineMensMorris
+from geometry import TWELVE
+
+# Unplayed board configuration
+INITIAL_BOARD = [[' ' for x in range(8)] for y in range(3)]
+
+
+# Twelve Men's Morris is played on the Nine Men's Morris board with diagonals joining the squares' corners
+class TwelveMensMorris(NineMensMorris):
+    # Tables of the Twelve Men's Morris board
+    geometry = TWELVE
+
+    # Create a game object:
+    # The board starts empty with no players yet and each player having 12 pieces to use with 0 on the board
+    def __init__(self, board=INITIAL_BOARD, last_player=None, max_pieces=12, min_pieces=12, max_loc=set(), min_loc=set()):
+        super().__init__(board, last_player, max_pieces, min_pieces, max_loc, min_loc)
+
+    # Return the utility of this game if it is over : Max winning is 1, Min winning is -1, Draw is 0
+    # Otherwise, return None
+    def utility(self):
+        # The game is a draw if the board fills up with all the pieces placed
+        if self.last_player is not None and self.max_pieces == 0 and self.min_pieces == 0 and not self.empty_bits():
+            return 0
+
+        return super().utility()
+
+    # Print the game in the console
+    def display(self):
+        print(self.board[0][0], '-' * 12, self.board[0][1], '-' * 12, self.board[0][2])
+        print('|', '\\' + ' ' * 11, '|', ' ' * 11 + '/', '|')
+        print('| ', self.board[1][0], '-' * 9, self.board[1][1], '-' * 9, self.board[1][2], ' |')
+        print('|   |', '\\' + ' ' * 7, '|', ' ' * 7 + '/', '|   |')
+        print('|   ' * 2, self.board[2][0], '-' * 3, self.board[2][1], '-' * 3, self.board[2][2], '   |' * 2)
+        print('|   ' * 3, ' ' * 5, '   |' * 3)
+        print(self.board[0][7], '-', self.board[1][7], '-', self.board[2][7], ' ' * 11,
+              self.board[2][3], '-', self.board[1][3], '-', self.board[0][3])
+        print('|   ' * 3, ' ' * 5, '   |' * 3)
+        print('|   ' * 2, self.board[2][6], '-' * 3, self.board[2][5], '-' * 3, self.board[2][4], '   |' * 2)
+        print('|   |', '/' + ' ' * 7, '|', ' ' * 7 + '\\', '|   |')
+        print('| ', self.board[1][6], '-' * 9, self.board[1][5], '-' * 9, self.board[1][4], ' |')
+        print('|', '/' + ' ' * 11, '|', ' ' * 11 + '\\', '|')
+        print(self.board[0][6], '-' * 12, self.board[0][5], '-' * 12, self.board[0][4])
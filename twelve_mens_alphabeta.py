@@ -0,0 +1,17 @@
+# Test of the alpha-beta mini-max agents with depth limiting on Twelve Men's Morris board
+
+from alphabeta9 import MaxPlayer, MinPlayer
+from twelve_men_morris import TwelveMensMorris
+max_player = MaxPlayer()
+min_player = MinPlayer()
+
+max_player.assume(min_player)
+min_player.assume(max_player)
+
+game = TwelveMensMorris()
+try:
+    game.play(max_player, min_player)
+
+finally:
+    max_player.close()
+    min_player.close()